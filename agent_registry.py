@@ -0,0 +1,171 @@
+import importlib
+from abc import ABC, abstractmethod
+import json
+import time
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+from agent_white import AGENT_SUGGESTIONS, AgentFeedback
+from colorinterpreter import AgentDecision, ColorEmotionInterpreter
+
+
+class FeedbackAgent(ABC):
+    """Base class for a per-color agent.
+
+    ``evaluate`` gets the context plus the shared analysis and returns an
+    ``AgentFeedback``. Agents that call out to a model can also define a
+    coroutine ``evaluate_async``, which the asyncio path awaits instead of
+    running ``evaluate`` in the thread pool. ``inline = True`` marks agents
+    cheap enough to run in the calling thread. Subclasses without
+    ``evaluate`` cannot be instantiated.
+    """
+    inline = False
+
+    def __init__(self, color: str, spec: Mapping):
+        self.color = color
+        self.hex_color = spec["color"]
+        self.emotions = list(spec["emotion"])
+
+    @abstractmethod
+    def evaluate(self, context: str, emotional_scores: Dict[str, float], decision: AgentDecision) -> AgentFeedback:
+        """Feedback of this agent for one analyzed context."""
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.color!r})"
+
+
+class KeywordAgent(FeedbackAgent):
+    """The built-in agent: its own emotion scores, their mean as confidence and a fixed suggestion."""
+    inline = True
+
+    def evaluate(self, context: str, emotional_scores: Dict[str, float], decision: AgentDecision) -> AgentFeedback:
+        # Filter scores voor deze agent's emoties
+        emotions = self.emotions
+        agent_emotions = {emotion: score for emotion, score in emotional_scores.items() if emotion in emotions}
+        confidence = sum(agent_emotions.values()) / len(agent_emotions) if agent_emotions else 0.0
+        return AgentFeedback(
+            color=self.hex_color,
+            emotion_scores=agent_emotions,
+            confidence=confidence,
+            suggestion=AGENT_SUGGESTIONS.get(self.color, "Neutrale reactie")
+        )
+
+
+class DelayedAgent(KeywordAgent):
+    """Stand-in for a model-backed agent: answers like KeywordAgent after ``latency`` seconds."""
+    inline = False
+
+    def __init__(self, color: str, spec: Mapping, latency: float = 0.1):
+        super().__init__(color, spec)
+        self.latency = latency
+
+    def evaluate(self, context: str, emotional_scores: Dict[str, float], decision: AgentDecision) -> AgentFeedback:
+        time.sleep(self.latency)
+        return super().evaluate(context, emotional_scores, decision)
+
+    async def evaluate_async(self, context: str, emotional_scores: Dict[str, float],
+                             decision: AgentDecision) -> AgentFeedback:
+        import asyncio
+
+        await asyncio.sleep(self.latency)
+        return super().evaluate(context, emotional_scores, decision)
+
+
+def _resolve_factory(path: str) -> Callable[..., FeedbackAgent]:
+    """Imports ``"module:attribute"``, e.g. ``"agent_registry:DelayedAgent"``."""
+    module_name, _, attribute = path.partition(":")
+    if not module_name or not attribute:
+        raise ValueError(f"Agent factory must look like 'module:attribute', got {path!r}")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class AgentRegistry:
+    """The per-color agents AgentWhite asks for feedback, with their timeouts.
+
+    Agents are registered per color of the interpreter's agent table, in
+    that order. ``default`` fills every color with a KeywordAgent, which
+    gives the same feedback as before the registry existed. ``deadline``
+    bounds a whole concurrent evaluation; each agent can also have its own
+    ``timeout`` (both in seconds, None for no limit).
+    """
+
+    def __init__(self, interpreter: ColorEmotionInterpreter, deadline: Optional[float] = None,
+                 default_timeout: Optional[float] = None):
+        self.interpreter = interpreter
+        self.deadline = deadline
+        self.default_timeout = default_timeout
+        self._agents: Dict[str, Tuple[FeedbackAgent, Optional[float]]] = {}
+
+    @classmethod
+    def default(cls, interpreter: ColorEmotionInterpreter) -> "AgentRegistry":
+        registry = cls(interpreter)
+        for color, spec in interpreter.agent_config["agents"].items():
+            registry.register(KeywordAgent(color, spec))
+        return registry
+
+    @classmethod
+    def from_config(cls, interpreter: ColorEmotionInterpreter, config: Union[str, Mapping]) -> "AgentRegistry":
+        """Builds a registry from a JSON file or an already parsed dict.
+
+        Example::
+
+            {
+              "deadline": 0.5,
+              "default_timeout": 0.25,
+              "agents": {
+                "blue": {"factory": "my_agents:BlueModelAgent", "timeout": 0.4, "options": {"url": "..."}},
+                "gray": {"enabled": false}
+              }
+            }
+
+        Colors that are not listed keep the KeywordAgent. A factory is called
+        as ``factory(color, spec, **options)`` with the color's entry from the
+        interpreter's agent table.
+        """
+        if isinstance(config, str):
+            with open(config, encoding="utf-8") as f:
+                config = json.load(f)
+        agents = interpreter.agent_config["agents"]
+        overrides = config.get("agents", {})
+        unknown = set(overrides) - set(agents)
+        if unknown:
+            raise ValueError(f"Agent config names unknown colors: {', '.join(sorted(unknown))}")
+
+        registry = cls(interpreter, config.get("deadline"), config.get("default_timeout"))
+        for color, spec in agents.items():
+            override = overrides.get(color, {})
+            if not override.get("enabled", True):
+                continue
+            if "factory" in override:
+                agent = _resolve_factory(override["factory"])(color, spec, **override.get("options", {}))
+            else:
+                agent = KeywordAgent(color, spec)
+            registry.register(agent, override.get("timeout"))
+        return registry
+
+    def register(self, agent: FeedbackAgent, timeout: Optional[float] = None):
+        """Adds or replaces the agent for ``agent.color``."""
+        if not callable(getattr(agent, "evaluate", None)):
+            raise TypeError(f"{agent!r} has no evaluate method")
+        if agent.color not in self.interpreter.agent_config["agents"]:
+            raise ValueError(f"No agent color {agent.color!r} in the interpreter's agent table")
+        self._agents[agent.color] = (agent, timeout)
+
+    def unregister(self, color: str):
+        self._agents.pop(color, None)
+
+    def timeout(self, color: str) -> Optional[float]:
+        timeout = self._agents[color][1]
+        return self.default_timeout if timeout is None else timeout
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def __contains__(self, color: str) -> bool:
+        return color in self._agents
+
+    def __iter__(self) -> Iterator[Tuple[str, FeedbackAgent]]:
+        """(kleur, agent) paren in de volgorde van de agent tabel."""
+        return ((color, self._agents[color][0]) for color in self.interpreter.color_names if color in self._agents)
+
+    def colors(self) -> List[str]:
+        return [color for color, _ in self]
@@ -1,70 +1,495 @@
-from typing import Dict, List, Tuple
-from colorinterpreter import ColorEmotionInterpreter, AgentDecision
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from collections.abc import Mapping
+from colorinterpreter import ColorEmotionInterpreter, AgentDecision, KEYWORD_WEIGHT, STRATEGIES, STRATEGY_CODES, Strategy
+from lazy_import import LazyModule
+from result_cache import MISSING, ResultCache, normalize_key
 import json
+import sys
+import time
 from dataclasses import dataclass
 from enum import Enum
 
-@dataclass
+# Suggestie per agent kleur
+AGENT_SUGGESTIONS = {
+    "green": "Positieve en ondersteunende reactie",
+    "yellow": "Voorzichtig en verduidelijkend",
+    "blue": "Empathisch en begripvol",
+    "purple": "Professioneel en afstandelijk",
+    "pink": "Zorgzaam en attent",
+    "red": "Direct en duidelijk",
+    "gray": "Neutraal en balancerend"
+}
+
+# NumPy is alleen nodig voor de batch API
+np = LazyModule("numpy")
+
+@dataclass(slots=True)
 class AgentFeedback:
     color: str
     emotion_scores: Dict[str, float]
     confidence: float
     suggestion: str
 
+# Sleutels van een gebalanceerde respons, in de volgorde van calculate_balanced_response
+RESPONSE_KEYS = ("context", "rainbow_vector", "strategy", "dominant_emotions", "agent_feedbacks")
+
+class ResponseView(Mapping):
+    """Read-only dict view op één rij van een ``BalancedResponseBatch``.
+
+    Gedraagt zich als het dict van ``calculate_balanced_response``, maar
+    bewaart alleen de batch en het rijnummer; geneste dicts worden pas
+    opgebouwd wanneer ze worden opgevraagd.
+    """
+    __slots__ = ("batch", "row")
+
+    def __init__(self, batch: "BalancedResponseBatch", row: int):
+        self.batch = batch
+        self.row = row
+
+    def __getitem__(self, key: str):
+        batch, row = self.batch, self.row
+        if key == "context":
+            return batch.contexts[row]
+        if key == "rainbow_vector":
+            return '#{:02x}{:02x}{:02x}'.format(*batch.rgb[row].tolist())
+        if key == "strategy":
+            return STRATEGIES[batch.strategy_codes[row]].value
+        if key == "dominant_emotions":
+            return {
+                batch.emotion_names[index]: score
+                for index, score in zip(batch.dominant_emotions[row].tolist(), batch.dominant_scores[row].tolist())
+            }
+        if key == "agent_feedbacks":
+            scores = batch.emotional_scores[row].tolist()
+            confidences = batch.confidences[row].tolist()
+            return {
+                color: {
+                    "color": batch.agent_colors[column],
+                    "emotion_scores": {batch.emotion_names[index]: scores[index] for index in batch.agent_emotions[column]},
+                    "confidence": confidences[column],
+                    "suggestion": AGENT_SUGGESTIONS.get(color, "Neutrale reactie")
+                }
+                for column, color in enumerate(batch.color_names)
+            }
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(RESPONSE_KEYS)
+
+    def __len__(self) -> int:
+        return len(RESPONSE_KEYS)
+
+    def __repr__(self) -> str:
+        return f"ResponseView({dict(self)!r})"
+
+@dataclass
+class BalancedResponseBatch:
+    """Kolomgewijze resultaten van ``calculate_balanced_responses``.
+
+    Rij ``i`` van elke array hoort bij ``contexts[i]``; kolommen volgen
+    ``color_names`` respectievelijk ``emotion_names``. Strategieën zijn
+    int8 codes (index in ``STRATEGIES``) en emoties int16 ids (index in de
+    gedeelde ``emotion_names``). ``batch[i]`` geeft een ``ResponseView``
+    met hetzelfde formaat als ``calculate_balanced_response``.
+    """
+    contexts: List[str]
+    color_names: List[str]
+    emotion_names: List[str]
+    agent_colors: List[str]            # hex kleur per agent, volgt color_names
+    agent_emotions: List[List[int]]    # emotie ids per agent, volgt color_names
+    matched: np.ndarray                # (N, kleuren) bool, trefwoord gevonden
+    emotional_scores: np.ndarray       # (N, emoties)
+    confidences: np.ndarray            # (N, kleuren)
+    cmyk_vectors: np.ndarray           # (N, 4)
+    rgb: np.ndarray                    # (N, 3) uint8 regenboogkleur
+    strategy_codes: np.ndarray         # (N,) int8
+    fallback: np.ndarray               # (N,) bool
+    dominant_emotions: np.ndarray      # (N, 3) int16 emotie ids
+    dominant_scores: np.ndarray        # (N, 3)
+    weights: Optional[np.ndarray] = None  # (N, kleuren) gewichten, alleen met een lexicon
+
+    def __len__(self) -> int:
+        return len(self.contexts)
+
+    @classmethod
+    def concatenate(cls, batches: List["BalancedResponseBatch"]) -> "BalancedResponseBatch":
+        """Voegt batches met dezelfde kolommen samen tot één batch, in volgorde."""
+        if not batches:
+            raise ValueError("Need at least one batch to concatenate")
+        first = batches[0]
+        if len(batches) == 1:
+            return first
+        weighted = any(batch.weights is not None for batch in batches)
+        return cls(
+            contexts=[context for batch in batches for context in batch.contexts],
+            color_names=first.color_names,
+            emotion_names=first.emotion_names,
+            agent_colors=first.agent_colors,
+            agent_emotions=first.agent_emotions,
+            **{name: np.concatenate([getattr(batch, name) for batch in batches])
+               for name in ("matched", "emotional_scores", "confidences", "cmyk_vectors", "rgb",
+                            "strategy_codes", "fallback", "dominant_emotions", "dominant_scores")},
+            weights=np.concatenate([batch.color_weights for batch in batches]) if weighted else None
+        )
+
+    def __getitem__(self, row: int) -> ResponseView:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return ResponseView(self, row)
+
+    def __iter__(self):
+        return (ResponseView(self, row) for row in range(len(self)))
+
+    @property
+    def color_weights(self) -> np.ndarray:
+        """(N, kleuren) gewichten zoals ``analyze_context`` ze toekent."""
+        if self.weights is not None:
+            return self.weights
+        return self.matched * KEYWORD_WEIGHT
+
+    @property
+    def strategies(self) -> np.ndarray:
+        """(N,) strategie waarden als strings."""
+        return np.array([strategy.value for strategy in STRATEGIES])[self.strategy_codes]
+
+    @property
+    def rainbow_vectors(self) -> List[str]:
+        return ['#{:02x}{:02x}{:02x}'.format(*row) for row in self.rgb.tolist()]
+
+    @property
+    def lab_vectors(self) -> np.ndarray:
+        """(N, 3) CIELAB waarden van de regenboogkleuren."""
+        from color_utils import ArrayColorConverter
+        return ArrayColorConverter.rgb_to_lab(self.rgb)
+
+    def nbytes(self) -> int:
+        """Geheugen van de kolommen in bytes, inclusief de context strings."""
+        arrays = (self.matched, self.emotional_scores, self.confidences, self.cmyk_vectors, self.rgb,
+                  self.strategy_codes, self.fallback, self.dominant_emotions, self.dominant_scores)
+        if self.weights is not None:
+            arrays += (self.weights,)
+        return (sum(array.nbytes for array in arrays) + sys.getsizeof(self.contexts)
+                + sum(sys.getsizeof(context) for context in self.contexts))
+
+    def to_dicts(self, interpreter: Optional[ColorEmotionInterpreter] = None) -> List[Dict]:
+        """Zet de kolommen om naar het dict formaat van ``calculate_balanced_response``."""
+        emotion_scores = self.emotional_scores.tolist()
+        confidences = self.confidences.tolist()
+        dominant_emotions = self.dominant_emotions.tolist()
+        dominant_scores = self.dominant_scores.tolist()
+        strategy_values = [strategy.value for strategy in STRATEGIES]
+        strategies = self.strategy_codes.tolist()
+        rainbow_vectors = self.rainbow_vectors
+
+        results = []
+        for row, context in enumerate(self.contexts):
+            scores = emotion_scores[row]
+            results.append({
+                "context": context,
+                "rainbow_vector": rainbow_vectors[row],
+                "strategy": strategy_values[strategies[row]],
+                "dominant_emotions": {
+                    self.emotion_names[index]: score
+                    for index, score in zip(dominant_emotions[row], dominant_scores[row])
+                },
+                "agent_feedbacks": {
+                    color: {
+                        "color": self.agent_colors[column],
+                        "emotion_scores": {self.emotion_names[index]: scores[index] for index in self.agent_emotions[column]},
+                        "confidence": confidences[row][column],
+                        "suggestion": AGENT_SUGGESTIONS.get(color, "Neutrale reactie")
+                    }
+                    for column, color in enumerate(self.color_names)
+                }
+            })
+        return results
+
 class AgentWhite:
-    def __init__(self):
-        self.interpreter = ColorEmotionInterpreter()
+    def __init__(self, cache_size: int = 0, cache_ttl: Optional[float] = None,
+                 agent_config: Optional[Union[str, Dict]] = None, max_workers: Optional[int] = None,
+                 lexicon: Optional[Union[str, "Lexicon"]] = None,
+                 interpreter: Optional[ColorEmotionInterpreter] = None):
+        """Met ``cache_size > 0`` worden analyses en responses gecached op
+        genormaliseerde tekst (LRU, optionele TTL in seconden). Gecachte
+        responses delen hun geneste dicts; behandel ze als read-only.
+
+        ``agent_config`` (pad naar JSON of dict) vult ``registry`` met eigen
+        agents, timeouts en een deadline, zie ``AgentRegistry.from_config``;
+        zonder config krijgt elke kleur de ingebouwde KeywordAgent.
+        ``max_workers`` begrenst per aanroep hoeveel trage agents tegelijk
+        draaien.
+        ``lexicon`` (pad naar een binair lexicon of een ``Lexicon``) geeft de
+        interpreter gewogen termen naast de ingebouwde trefwoorden.
+        ``interpreter`` gebruikt een bestaande interpreter in plaats van een
+        nieuwe; ``lexicon`` en de analyse cache komen dan van die interpreter.
+        """
+        from agent_registry import AgentRegistry  # agent_registry importeert deze module
+
+        if interpreter is None:
+            interpreter = ColorEmotionInterpreter(cache_size=cache_size, cache_ttl=cache_ttl, lexicon=lexicon)
+        self.interpreter = interpreter
         self.agent_feedbacks: Dict[str, AgentFeedback] = {}
+        self.cache = ResultCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self._cache_config_version = self.interpreter.config_version
+        # Bron van de registry, zodat worker processen dezelfde agents kunnen bouwen
+        self.agent_config = agent_config
+        if agent_config is None:
+            self.registry = AgentRegistry.default(self.interpreter)
+        else:
+            self.registry = AgentRegistry.from_config(self.interpreter, agent_config)
+        self.max_workers = max_workers
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Tellers van de response cache en de analyse cache."""
+        if self.cache is None:
+            return {}
+        analyses = self.interpreter.cache
+        return {"responses": self.cache.stats(), "analyses": analyses.stats() if analyses is not None else {}}
         
-    def collect_agent_feedback(self, context: str) -> Dict[str, AgentFeedback]:
-        """Verzamelt feedback van alle agents voor de gegeven context."""
+    def collect_agent_feedback(self, context: str,
+                               analysis: Optional[Tuple[Dict[str, float], AgentDecision]] = None) -> Dict[str, AgentFeedback]:
+        """Verzamelt feedback van alle agents voor de gegeven context.
+
+        De context wordt één keer geanalyseerd en het resultaat wordt naar
+        alle agents gestuurd. Een eerder berekende ``analysis`` (uitvoer van
+        ``analyze_context``) kan worden meegegeven om die analyse over te slaan.
+        """
         feedbacks = {}
         
-        # Verzamel feedback van elke agent
-        for color, agent in self.interpreter.agent_config["agents"].items():
-            # Simuleer agent feedback (in een echte implementatie zou dit door de agents zelf worden gedaan)
-            emotional_scores, decision = self.interpreter.analyze_context(context)
-            
-            # Filter scores voor deze agent's emoties
-            agent_emotions = {emotion: score for emotion, score in emotional_scores.items() 
-                            if emotion in agent["emotion"]}
-            
-            # Bereken confidence score
-            confidence = sum(agent_emotions.values()) / len(agent_emotions) if agent_emotions else 0.0
-            
-            # Genereer suggestie op basis van emoties
-            suggestion = self._generate_suggestion(color, agent_emotions, decision)
-            
-            feedbacks[color] = AgentFeedback(
-                color=agent["color"],
-                emotion_scores=agent_emotions,
-                confidence=confidence,
-                suggestion=suggestion
-            )
+        # Analyseer de context één keer en deel het resultaat met alle agents
+        if analysis is None:
+            analysis = self.interpreter.analyze_context(context)
+        emotional_scores, decision = analysis
+        
+        # Verzamel feedback van elke geregistreerde agent, één voor één
+        for color, agent in self.registry:
+            feedbacks[color] = agent.evaluate(context, emotional_scores, decision)
         
         self.agent_feedbacks = feedbacks
         return feedbacks
+
+    @staticmethod
+    def _start_agent(color: str, agent, context: str, emotional_scores: Dict[str, float], decision: AgentDecision):
+        """Start ``agent.evaluate`` in een eigen daemon thread en geeft de future terug.
+
+        Een agent die over zijn timeout gaat houdt alleen zijn eigen thread
+        bezet; een gedeelde pool zou na een paar van zulke agents vollopen en
+        ook snelle agents achter de wachtrij laten verlopen.
+        """
+        import threading
+        from concurrent.futures import Future
+
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(agent.evaluate(context, emotional_scores, decision))
+            except BaseException as error:
+                future.set_exception(error)
+
+        threading.Thread(target=run, name=f"agent-{color}", daemon=True).start()
+        return future
+
+    def collect_agent_feedback_concurrent(self, context: str,
+                                          analysis: Optional[Tuple[Dict[str, float], AgentDecision]] = None,
+                                          deadline: Optional[float] = None) -> Tuple[Dict[str, AgentFeedback], Dict[str, str]]:
+        """Vraagt alle agents tegelijk om feedback, elke trage agent in een eigen thread.
+
+        Elke agent krijgt zijn eigen timeout uit de registry, gerekend vanaf
+        het moment dat hij start, en samen krijgen ze ``deadline`` seconden
+        (standaard ``registry.deadline``). Met ``max_workers`` wachten de
+        overige agents tot er een plek vrijkomt; een agent die verloopt telt
+        dan niet meer mee. Geeft ``(feedbacks, missing)`` terug: de feedback
+        van de agents die op tijd antwoordden en per ontbrekende kleur de
+        reden (``"timeout"``, ``"deadline"`` of ``"error: ..."``). Threads van
+        te late agents lopen door, maar hun resultaat wordt genegeerd.
+        """
+        from collections import deque
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        if analysis is None:
+            analysis = self.interpreter.analyze_context(context)
+        emotional_scores, decision = analysis
+        deadline = self.registry.deadline if deadline is None else deadline
+        end = None if deadline is None else time.monotonic() + deadline
+        results: Dict[str, AgentFeedback] = {}
+        missing: Dict[str, str] = {}
+
+        waiting = deque((color, agent) for color, agent in self.registry if not agent.inline)
+        limit = self.max_workers or max(len(waiting), 1)
+        pending = {}  # future -> kleur
+        expiry = {}  # future -> (tijdstip waarop we stoppen met wachten, reden)
+
+        def launch():
+            while waiting and len(pending) < limit:
+                color, agent = waiting.popleft()
+                future = self._start_agent(color, agent, context, emotional_scores, decision)
+                started = time.monotonic()
+                timeout = self.registry.timeout(color)
+                if timeout is not None and (end is None or started + timeout < end):
+                    expiry[future] = (started + timeout, "timeout")
+                else:
+                    expiry[future] = (end, "deadline")
+                pending[future] = color
+
+        # Trage agents eerst starten, dan de goedkope inline agents
+        launch()
+        for color, agent in self.registry:
+            if agent.inline:
+                try:
+                    results[color] = agent.evaluate(context, emotional_scores, decision)
+                except Exception as error:
+                    missing[color] = f"error: {error!r}"
+
+        while pending or waiting:
+            now = time.monotonic()
+            for future in [future for future in pending if expiry[future][0] is not None and expiry[future][0] <= now]:
+                missing[pending.pop(future)] = expiry[future][1]
+            if end is not None and now >= end:
+                for color, _ in waiting:
+                    missing[color] = "deadline"
+                waiting.clear()
+            launch()
+            if not pending:
+                break
+            limits = [expiry[future][0] for future in pending if expiry[future][0] is not None]
+            done, _ = wait(pending, timeout=max(0.0, min(limits) - now) if limits else None,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                color = pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    missing[color] = f"error: {error!r}"
+                else:
+                    results[color] = future.result()
+
+        feedbacks = {color: results[color] for color in self.registry.colors() if color in results}
+        self.agent_feedbacks = feedbacks
+        return feedbacks, {color: missing[color] for color in self.registry.colors() if color in missing}
+
+    async def collect_agent_feedback_async(self, context: str,
+                                           analysis: Optional[Tuple[Dict[str, float], AgentDecision]] = None,
+                                           deadline: Optional[float] = None) -> Tuple[Dict[str, AgentFeedback], Dict[str, str]]:
+        """Als ``collect_agent_feedback_concurrent``, maar voor asyncio.
+
+        Agents met een coroutine ``evaluate_async`` worden direct ge-await,
+        andere niet-inline agents draaien elk in een eigen thread (hoogstens
+        ``max_workers`` tegelijk). Te late agents worden geannuleerd.
+        """
+        import asyncio
+        import contextlib
+
+        if analysis is None:
+            analysis = self.interpreter.analyze_context(context)
+        emotional_scores, decision = analysis
+        deadline = self.registry.deadline if deadline is None else deadline
+        results: Dict[str, AgentFeedback] = {}
+        missing: Dict[str, str] = {}
+        slots = asyncio.Semaphore(self.max_workers) if self.max_workers else contextlib.nullcontext()
+
+        async def run_in_thread(color, agent):
+            # De timeout loopt pas zodra de agent een plek heeft
+            async with slots:
+                future = self._start_agent(color, agent, context, emotional_scores, decision)
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.registry.timeout(color))
+
+        tasks = {}
+        for color, agent in self.registry:
+            if agent.inline:
+                continue
+            if hasattr(agent, "evaluate_async"):
+                awaitable = asyncio.wait_for(agent.evaluate_async(context, emotional_scores, decision),
+                                             self.registry.timeout(color))
+            else:
+                awaitable = run_in_thread(color, agent)
+            tasks[asyncio.ensure_future(awaitable)] = color
+        for color, agent in self.registry:
+            if agent.inline:
+                try:
+                    results[color] = agent.evaluate(context, emotional_scores, decision)
+                except Exception as error:
+                    missing[color] = f"error: {error!r}"
+
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=deadline)
+            for task in pending:
+                task.cancel()
+                missing[tasks[task]] = "deadline"
+            for task in done:
+                error = task.exception()
+                if isinstance(error, asyncio.TimeoutError):
+                    missing[tasks[task]] = "timeout"
+                elif error is not None:
+                    missing[tasks[task]] = f"error: {error!r}"
+                else:
+                    results[tasks[task]] = task.result()
+
+        feedbacks = {color: results[color] for color in self.registry.colors() if color in results}
+        self.agent_feedbacks = feedbacks
+        return feedbacks, {color: missing[color] for color in self.registry.colors() if color in missing}
     
-    def _generate_suggestion(self, color: str, emotions: Dict[str, float], decision: AgentDecision) -> str:
-        """Genereert een suggestie op basis van de agent's emoties en beslissing."""
-        dominant_emotion = max(emotions.items(), key=lambda x: x[1])[0]
-        
-        suggestions = {
-            "green": "Positieve en ondersteunende reactie",
-            "yellow": "Voorzichtig en verduidelijkend",
-            "blue": "Empathisch en begripvol",
-            "purple": "Professioneel en afstandelijk",
-            "pink": "Zorgzaam en attent",
-            "red": "Direct en duidelijk",
-            "gray": "Neutraal en balancerend"
-        }
-        
-        return suggestions.get(color, "Neutrale reactie")
-    
-    def calculate_balanced_response(self, context: str) -> Dict:
-        """Berekent een gebalanceerde respons op basis van alle agent feedback."""
-        feedbacks = self.collect_agent_feedback(context)
-        
+    def calculate_balanced_response(self, context: str,
+                                    analysis: Optional[Tuple[Dict[str, float], AgentDecision]] = None) -> Dict:
+        """Berekent een gebalanceerde respons op basis van alle agent feedback.
+
+        Net als bij ``collect_agent_feedback`` kan een eerder berekende
+        ``analysis`` worden meegegeven, bv. wanneer de aanroeper ook de
+        ``AgentDecision`` (CMYK vector, fallback) nodig heeft.
+        """
+        key = None
+        if self.cache is not None and analysis is None:
+            # Een gewijzigde config maakt alle gecachte responses ongeldig
+            self.interpreter.check_config()
+            if self.interpreter.config_version != self._cache_config_version:
+                self.cache.clear()
+                self._cache_config_version = self.interpreter.config_version
+            key = normalize_key(context)
+            cached = self.cache.get(key)
+            if cached is not MISSING:
+                self.agent_feedbacks, response = cached
+                return {**response, "context": context}
+
+        # Eén analyse voor zowel de agent feedback als de uiteindelijke beslissing
+        if analysis is None:
+            analysis = self.interpreter.analyze_context(context)
+        emotional_scores, decision = analysis
+        feedbacks = self.collect_agent_feedback(context, (emotional_scores, decision))
+        response = self._build_response(context, decision, feedbacks)
+        if key is not None:
+            self.cache.put(key, (feedbacks, response))
+        return response
+
+    def calculate_balanced_response_concurrent(self, context: str,
+                                               analysis: Optional[Tuple[Dict[str, float], AgentDecision]] = None,
+                                               deadline: Optional[float] = None) -> Dict:
+        """Als ``calculate_balanced_response``, met de agents gelijktijdig in eigen threads.
+
+        De respons wordt opgebouwd uit de agents die op tijd antwoordden;
+        ``missing_agents`` geeft per ontbrekende kleur de reden. Deze
+        gedeeltelijke responses worden niet gecached.
+        """
+        if analysis is None:
+            analysis = self.interpreter.analyze_context(context)
+        feedbacks, missing = self.collect_agent_feedback_concurrent(context, analysis, deadline)
+        return {**self._build_response(context, analysis[1], feedbacks), "missing_agents": missing}
+
+    async def calculate_balanced_response_async(self, context: str,
+                                                analysis: Optional[Tuple[Dict[str, float], AgentDecision]] = None,
+                                                deadline: Optional[float] = None) -> Dict:
+        """Als ``calculate_balanced_response_concurrent``, voor gebruik in een asyncio event loop."""
+        if analysis is None:
+            analysis = self.interpreter.analyze_context(context)
+        feedbacks, missing = await self.collect_agent_feedback_async(context, analysis, deadline)
+        return {**self._build_response(context, analysis[1], feedbacks), "missing_agents": missing}
+
+    def _build_response(self, context: str, decision: AgentDecision, feedbacks: Dict[str, AgentFeedback]) -> Dict:
+        """Bouwt de gebalanceerde respons uit de beslissing en de verzamelde feedback."""
         # Bereken gewogen gemiddelde van alle feedback
         total_confidence = sum(fb.confidence for fb in feedbacks.values())
         weighted_scores = {}
@@ -79,10 +504,7 @@ class AgentWhite:
         # Bepaal de dominante emoties
         dominant_emotions = sorted(weighted_scores.items(), key=lambda x: x[1], reverse=True)[:3]
         
-        # Genereer de uiteindelijke beslissing
-        _, decision = self.interpreter.analyze_context(context)
-        
-        return {
+        response = {
             "context": context,
             "rainbow_vector": decision.rainbow_vector,
             "strategy": decision.strategy.value,
@@ -97,6 +519,105 @@ class AgentWhite:
                 for color, fb in feedbacks.items()
             }
         }
+        return response
+
+    def calculate_balanced_responses(self, texts: Iterable[str],
+                                     expand: bool = False) -> Union[BalancedResponseBatch, List[Dict]]:
+        """Berekent gebalanceerde responses voor veel teksten tegelijk.
+
+        Alle rekenstappen werken op matrices (teksten x kleuren), zodat er per
+        tekst alleen een trefwoord scan in Python overblijft. Met
+        ``expand=True`` komt dezelfde lijst dicts terug als een lus over
+        ``calculate_balanced_response`` met de ingebouwde agents; agents uit
+        een ``agent_config`` worden hier niet aangeroepen.
+        """
+        interpreter = self.interpreter
+        # Eén set tabellen voor de hele batch, ook als de config intussen herladen wordt
+        tables = interpreter.tables
+        contexts = list(texts)
+        color_index = tables.color_index
+        matcher = interpreter.keyword_matcher
+        lexicon = interpreter.lexicon
+
+        # Gewichtsmatrix: teksten x kleuren
+        weights = np.zeros((len(contexts), len(color_index)), dtype=np.float64)
+        for row, context in enumerate(contexts):
+            for color in matcher.matched_labels(context.lower()):
+                weights[row, color_index[color]] = KEYWORD_WEIGHT
+            if lexicon is not None:
+                for color, weight in lexicon.color_weights(context).items():
+                    column = color_index.get(color)
+                    if column is not None and KEYWORD_WEIGHT * weight > weights[row, column]:
+                        weights[row, column] = KEYWORD_WEIGHT * weight
+
+        # Emotionele scores: product met de tint-gewicht matrix
+        emotional_scores = interpreter.emotional_score_matrix(weights, tables)
+
+        # Confidence per agent: gemiddelde van de eigen emotie scores
+        confidences = np.zeros_like(weights)
+        for column, emotions in enumerate(tables.agent_emotions):
+            if len(emotions):
+                total = np.zeros(len(contexts))
+                for emotion in emotions:
+                    total += emotional_scores[:, emotion]
+                confidences[:, column] = total / len(emotions)
+
+        # Gewogen emotie scores en top drie dominante emoties
+        total_confidence = np.zeros(len(contexts))
+        for column in range(confidences.shape[1]):
+            total_confidence += confidences[:, column]
+        safe_total = np.where(total_confidence > 0, total_confidence, 1.0)
+        agent_weight = np.where((total_confidence > 0)[:, None], confidences / safe_total[:, None], 0.0)
+        weighted_scores = np.zeros_like(emotional_scores)
+        for column, emotions in enumerate(tables.agent_emotions):
+            weighted_scores[:, emotions] += emotional_scores[:, emotions] * agent_weight[:, column, None]
+        dominant = np.argsort(-weighted_scores, axis=1, kind="stable")[:, :3]
+        dominant_scores = np.take_along_axis(weighted_scores, dominant, axis=1)
+
+        # CMYK blend voor alle rijen tegelijk
+        total_weight = np.zeros(len(contexts))
+        for column in range(weights.shape[1]):
+            total_weight += weights[:, column]
+        has_weight = total_weight > 0
+        normalized = weights / np.where(has_weight, total_weight, 1.0)[:, None]
+        cmyk = np.zeros((len(contexts), 4))
+        for column, agent_cmyk in enumerate(interpreter.array_tables(tables)["agent_cmyk"]):
+            cmyk += normalized[:, column, None] * agent_cmyk
+        cmyk[~has_weight] = (0.0, 0.0, 0.0, 1.0)
+
+        # Regenboogkleur als 8-bit RGB
+        c, m, y, k = cmyk.T
+        rgb = np.rint(255 * (1 - cmyk[:, :3]) * (1 - k)[:, None]).astype(np.uint8)
+
+        # Strategie code, in dezelfde volgorde als determine_strategy
+        strategy_codes = np.select(
+            [k > 0.7, (y > 0.5) & (c < 0.3), m > 0.5, c > 0.5],
+            [STRATEGY_CODES[Strategy.CAUTIOUS], STRATEGY_CODES[Strategy.DIRECT],
+             STRATEGY_CODES[Strategy.CAUTIOUS], STRATEGY_CODES[Strategy.EMPATHIC]],
+            default=STRATEGY_CODES[Strategy.NEUTRAL]
+        ).astype(np.int8)
+
+        agents = interpreter.agent_config["agents"]
+        batch = BalancedResponseBatch(
+            contexts=contexts,
+            color_names=tables.color_names,
+            emotion_names=tables.emotion_names,
+            agent_colors=[agents[color]["color"] for color in tables.color_names],
+            agent_emotions=tables.agent_emotions,
+            matched=weights > 0,
+            emotional_scores=emotional_scores,
+            confidences=confidences,
+            cmyk_vectors=cmyk,
+            rgb=rgb,
+            strategy_codes=strategy_codes,
+            fallback=k > 0.8,
+            dominant_emotions=dominant.astype(np.int16),
+            dominant_scores=dominant_scores,
+            weights=weights if lexicon is not None else None
+        )
+        if expand:
+            return batch.to_dicts(interpreter)
+        return batch
 
 def main():
     agent_white = AgentWhite()
@@ -1,45 +1,30 @@
-import streamlit as st
-import numpy as np
-import plotly.graph_objects as go
+from __future__ import annotations
+
 from agent_white import AgentWhite
 from color_utils import ColorConverter
-from typing import Tuple, List
+from lazy_import import LazyModule
+from typing import Dict, Tuple, List
 import colorsys
 
+# Zware afhankelijkheden pas laden wanneer ze echt gebruikt worden
+st = LazyModule("streamlit")
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
+go = LazyModule("plotly.graph_objects")
+
+# Aantal teksten per batch in bulk modus
+BULK_CHUNK_SIZE = 2000
+# Maximaal aantal punten in de bulk LAB plot
+MAX_PLOT_POINTS = 5000
+
 def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
     """Convert hex color to RGB tuple."""
     hex_color = hex_color.lstrip('#')
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
 def rgb_to_lab(rgb: Tuple[int, int, int]) -> Tuple[float, float, float]:
-    """Convert RGB to CIELAB color space."""
-    # Convert RGB to XYZ
-    r, g, b = [x/255.0 for x in rgb]
-    
-    # Convert to sRGB
-    r = r/12.92 if r <= 0.04045 else ((r + 0.055)/1.055)**2.4
-    g = g/12.92 if g <= 0.04045 else ((g + 0.055)/1.055)**2.4
-    b = b/12.92 if b <= 0.04045 else ((b + 0.055)/1.055)**2.4
-    
-    # Convert to XYZ
-    x = r * 0.4124564 + g * 0.3575761 + b * 0.1804375
-    y = r * 0.2126729 + g * 0.7151522 + b * 0.0721750
-    z = r * 0.0193339 + g * 0.1191920 + b * 0.9503041
-    
-    # Convert to Lab
-    x = x/0.95047
-    y = y/1.00000
-    z = z/1.08883
-    
-    x = x**(1/3) if x > 0.008856 else (7.787 * x) + 16/116
-    y = y**(1/3) if y > 0.008856 else (7.787 * y) + 16/116
-    z = z**(1/3) if z > 0.008856 else (7.787 * z) + 16/116
-    
-    L = (116 * y) - 16
-    a = 500 * (x - y)
-    b = 200 * (y - z)
-    
-    return L, a, b
+    """Convert RGB to CIELAB color space (uses the LAB lookup table when enabled)."""
+    return ColorConverter.rgb_to_lab(*rgb)
 
 def create_lab_visualization(colors: List[Tuple[str, float]]) -> go.Figure:
     """Create a 3D visualization of colors in CIELAB space."""
@@ -81,12 +66,145 @@ def create_lab_visualization(colors: List[Tuple[str, float]]) -> go.Figure:
     
     return fig
 
+def aggregate_lab_points(lab: np.ndarray, max_points: int = MAX_PLOT_POINTS) -> Dict[str, np.ndarray]:
+    """Aggregate LAB points into grid cells so a plot never exceeds max_points markers.
+
+    The cell size starts at 1 LAB unit and doubles until the number of
+    occupied cells fits. Each cell is drawn at the mean of its points,
+    with the point count as weight.
+    """
+    lab = np.asarray(lab, dtype=np.float64).reshape(-1, 3)
+    if len(lab) == 0:
+        return {"lab": lab, "count": np.zeros(0, dtype=np.int64)}
+
+    cell_size = 1.0
+    while True:
+        # Celcoördinaten in één int64 sleutel; L*, a*, b* passen ruim in 21 bits
+        cells = np.floor(lab / cell_size).astype(np.int64) + (1 << 20)
+        keys = (cells[:, 0] << 42) | (cells[:, 1] << 21) | cells[:, 2]
+        unique_keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        if len(unique_keys) <= max_points:
+            break
+        cell_size *= 2
+
+    sums = np.empty((len(unique_keys), 3))
+    for channel in range(3):
+        sums[:, channel] = np.bincount(inverse, weights=lab[:, channel], minlength=len(unique_keys))
+    return {"lab": sums / counts[:, None], "count": counts}
+
+
+def create_bulk_lab_visualization(lab: np.ndarray, max_points: int = MAX_PLOT_POINTS) -> go.Figure:
+    """Create a WebGL a*/b* scatter of many LAB colors, aggregated to at most max_points markers."""
+    from color_utils import ArrayColorConverter
+    aggregated = aggregate_lab_points(lab, max_points)
+    points, counts = aggregated["lab"], aggregated["count"]
+
+    fig = go.Figure(data=[go.Scattergl(
+        x=points[:, 1],  # a*
+        y=points[:, 2],  # b*
+        mode='markers',
+        marker=dict(
+            size=4 + 3 * np.log1p(counts),  # Scale size by number of texts
+            color=ArrayColorConverter.lab_to_hex(points),
+            opacity=0.8
+        ),
+        text=[f"L*: {l:.1f}<br>a*: {a:.1f}<br>b*: {b:.1f}<br>teksten: {n}"
+              for (l, a, b), n in zip(points.tolist(), counts.tolist())],
+        hoverinfo='text'
+    )])
+
+    fig.update_layout(
+        title=f'CIELAB a*/b* ({int(counts.sum())} teksten, {len(points)} punten)',
+        xaxis=dict(title='a* (green-red)', range=[-128, 128]),
+        yaxis=dict(title='b* (blue-yellow)', range=[-128, 128]),
+        showlegend=False
+    )
+
+    return fig
+
+
+def _create_agent() -> AgentWhite:
+    return AgentWhite()
+
+
+def get_agent() -> AgentWhite:
+    """One AgentWhite per server process, reused across reruns."""
+    # Decorator pas hier toepassen zodat importeren van app geen streamlit laadt
+    return st.cache_resource(_create_agent)()
+
+
+def bulk_mode(agent: AgentWhite):
+    """Analyze an uploaded CSV of texts in batches."""
+    from color_utils import ArrayColorConverter
+    uploaded = st.file_uploader("Upload een CSV bestand met teksten", type="csv")
+    if uploaded is None:
+        return
+
+    frame = pd.read_csv(uploaded)
+    if frame.empty:
+        st.warning("Het CSV bestand bevat geen rijen.")
+        return
+    column = st.selectbox("Tekstkolom", list(frame.columns))
+    texts = frame[column].fillna("").astype(str).tolist()
+
+    # Resultaten blijven bewaard tussen reruns zolang bestand en kolom gelijk zijn
+    result_key = (uploaded.name, uploaded.size, column)
+    results = st.session_state.get("bulk_results")
+    if results is None or results["key"] != result_key:
+        if not st.button(f"Analyseer {len(texts)} teksten"):
+            return
+
+        progress = st.progress(0.0, text="Analyseren...")
+        summary = st.empty()
+        rainbow_vectors, strategies = [], []
+        for start in range(0, len(texts), BULK_CHUNK_SIZE):
+            batch = agent.calculate_balanced_responses(texts[start:start + BULK_CHUNK_SIZE])
+            rainbow_vectors += batch.rainbow_vectors
+            strategies += batch.strategies.tolist()
+            done = len(rainbow_vectors)
+            progress.progress(done / len(texts), text=f"{done} / {len(texts)} teksten")
+            summary.bar_chart(pd.Series(strategies).value_counts())
+        progress.empty()
+        summary.empty()
+
+        lab = ArrayColorConverter.rgb_to_lab(ArrayColorConverter.hex_to_rgb(rainbow_vectors))
+        results = {
+            "key": result_key,
+            "table": pd.DataFrame({
+                "context": texts,
+                "rainbow_vector": rainbow_vectors,
+                "strategy": strategies,
+                "L": lab[:, 0],
+                "a": lab[:, 1],
+                "b": lab[:, 2],
+            }),
+            "lab": lab,
+        }
+        st.session_state["bulk_results"] = results
+
+    table = results["table"]
+    st.subheader("Strategieën")
+    st.bar_chart(table["strategy"].value_counts())
+
+    st.subheader("CIELAB Kleurruimte Visualisatie")
+    st.plotly_chart(create_bulk_lab_visualization(results["lab"]))
+
+    st.subheader("Resultaten")
+    st.dataframe(table.head(1000))
+    st.download_button("Download resultaten (CSV)", table.to_csv(index=False), file_name="analyse.csv",
+                       mime="text/csv")
+
+
 def main():
     st.title("🧠 Re-Monster Color Agent")
     st.write("Test de Re-Monster Color Agent met eigen input en bekijk de kleuranalyse in CIELAB ruimte.")
     
-    # Initialize Agent White
-    agent = AgentWhite()
+    # Agent White blijft bewaard tussen reruns
+    agent = get_agent()
+
+    if st.radio("Modus", ["Enkele tekst", "Bulk upload (CSV)"], horizontal=True) != "Enkele tekst":
+        bulk_mode(agent)
+        return
     
     # Text input
     user_input = st.text_area("Voer je tekst in:", "Ik ben erg blij met het resultaat!")
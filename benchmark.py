@@ -0,0 +1,437 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from agent_white import AgentWhite
+from color_utils import ArrayColorConverter, ColorConverter
+from colorinterpreter import ColorEmotionInterpreter
+
+
+SAMPLE_CONTEXTS = [
+    "Ik ben erg blij met het resultaat!",
+    "Ik ben woedend over wat er is gebeurd.",
+    "Ik voel me een beetje verdrietig vandaag.",
+    "Ik weet niet wat ik moet doen, ik voel me overweldigd.",
+    "Ik ben blij met de promotie, maar ook een beetje nerveus over de nieuwe verantwoordelijkheden.",
+    "Ik ben boos op mezelf omdat ik me zo verdrietig voel over iets kleins.",
+    "Er is een mengeling van trots en nederigheid in mijn hart.",
+    "dankjewel",
+]
+
+# Woordenschat voor synthetische Nederlandse corpora
+EMOTION_WORDS = [
+    "blij", "gelukkig", "kwaad", "woedend", "verdrietig", "gekwetst", "jaloezie",
+    "schuld", "ongeloof", "overweldigd", "nerveus", "opgelucht", "teleurgesteld",
+]
+FILLER_WORDS = [
+    "ik", "ben", "erg", "een", "beetje", "met", "het", "resultaat", "vandaag", "maar",
+    "ook", "over", "wat", "er", "is", "gebeurd", "voel", "me", "de", "nieuwe", "collega",
+    "vergadering", "project", "weekend", "bericht", "dankjewel", "morgen", "niet", "zo",
+]
+
+CORPUS_SIZES = {"small": 100, "medium": 1000, "large": 10000}
+
+# Modules die een koude import van agent_white niet mag laden
+HEAVY_MODULES = ("numpy", "scipy", "pandas", "plotly", "streamlit")
+
+
+def synthetic_corpus(size: int, seed: int = 42, emotion_rate: float = 0.15) -> List[str]:
+    """Builds a reproducible corpus of Dutch-like chat messages."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        length = rng.randint(3, 30)
+        words = [
+            rng.choice(EMOTION_WORDS) if rng.random() < emotion_rate else rng.choice(FILLER_WORDS)
+            for _ in range(length)
+        ]
+        corpus.append(" ".join(words).capitalize() + rng.choice([".", "!", "?", ""]))
+    return corpus
+
+
+def legacy_balanced_response(agent: AgentWhite, context: str) -> Dict:
+    """Reference implementation that analyzes the context once per agent plus once for the decision."""
+    interpreter = agent.interpreter
+    for _ in interpreter.agent_config["agents"]:
+        interpreter.analyze_context(context)
+    return agent.calculate_balanced_response(context)
+
+
+@dataclass
+class BenchmarkCase:
+    """One benchmark: ``setup`` returns the operation to time.
+
+    ``items`` is the number of logical operations (texts, colors) one call
+    of the operation performs, so ops/sec is comparable between scalar and
+    batch cases.
+    """
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    items: int = 1
+
+
+def _cycle(values: List, func: Callable) -> Callable[[], object]:
+    """Returns an operation that applies func to the next value on each call."""
+    state = {"index": 0}
+
+    def op():
+        value = values[state["index"] % len(values)]
+        state["index"] += 1
+        return func(value)
+    return op
+
+
+def build_cases(sizes: List[str]) -> List[BenchmarkCase]:
+    rng = np.random.default_rng(42)
+    rgb = rng.integers(0, 256, (10000, 3))
+    lab = ArrayColorConverter.rgb_to_lab(rgb)
+    cmyk = ArrayColorConverter.rgb_to_cmyk(rgb)
+    rgb_list = [tuple(row) for row in rgb.tolist()]
+    lab_list = [tuple(row) for row in lab.tolist()]
+    cmyk_list = [tuple(row) for row in cmyk.tolist()]
+
+    cases = [
+        BenchmarkCase("converter.scalar.rgb_to_lab", lambda: _cycle(rgb_list, lambda c: ColorConverter.rgb_to_lab(*c))),
+        BenchmarkCase("converter.scalar.lab_to_rgb", lambda: _cycle(lab_list, lambda c: ColorConverter.lab_to_rgb(*c))),
+        BenchmarkCase("converter.scalar.rgb_to_cmyk", lambda: _cycle(rgb_list, lambda c: ColorConverter.rgb_to_cmyk(*c))),
+        BenchmarkCase("converter.scalar.cmyk_to_hex", lambda: _cycle(cmyk_list, lambda c: ColorConverter.cmyk_to_hex(*c))),
+        BenchmarkCase("converter.batch.rgb_to_lab", lambda: lambda: ArrayColorConverter.rgb_to_lab(rgb), items=len(rgb)),
+        BenchmarkCase("converter.batch.lab_to_rgb", lambda: lambda: ArrayColorConverter.lab_to_rgb(lab), items=len(lab)),
+        BenchmarkCase("converter.batch.rgb_to_cmyk", lambda: lambda: ArrayColorConverter.rgb_to_cmyk(rgb), items=len(rgb)),
+        BenchmarkCase("converter.batch.cmyk_to_hex", lambda: lambda: ArrayColorConverter.cmyk_to_hex(cmyk), items=len(cmyk)),
+        BenchmarkCase("palette.analogous", lambda: _cycle(lab_list, lambda c: ColorConverter.generate_analogous_palette(*c))),
+        BenchmarkCase("palette.triadic", lambda: _cycle(lab_list, lambda c: ColorConverter.generate_triadic_palette(*c))),
+        BenchmarkCase("palette.emotion", lambda: _cycle(
+            [{"blij": 0.8, "kwaad": 0.2}, {"verdriet": 1.0, "verward": 0.3}, {"overweldigd": 0.5}],
+            ColorConverter.generate_emotion_palette)),
+        BenchmarkCase("palette.batch.analogous", lambda: lambda: ArrayColorConverter.generate_analogous_palette(lab), items=len(lab)),
+        BenchmarkCase("palette.batch.triadic", lambda: lambda: ArrayColorConverter.generate_triadic_palette(lab), items=len(lab)),
+        BenchmarkCase("palette.batch.analogous_hex",
+                      lambda: lambda: ArrayColorConverter.generate_analogous_palette(lab, as_hex=True), items=len(lab)),
+    ]
+
+    def delta_e_case(metric: str):
+        from color_difference import pairwise_delta_e
+        sample = lab[:1000]
+        return lambda: pairwise_delta_e(sample, metric=metric)
+
+    cases += [
+        BenchmarkCase(f"delta_e.pairwise.{metric}", lambda metric=metric: delta_e_case(metric), items=1000 * 1000)
+        for metric in ("cie76", "cie94", "ciede2000")
+    ]
+
+    def palette_index_case(single: bool):
+        from palette_index import PaletteIndex
+        index = PaletteIndex()
+        if single:
+            return _cycle(lab_list, index.nearest)
+        return lambda: index.query_lab(lab, k=3)
+
+    cases += [
+        BenchmarkCase("palette_index.nearest", lambda: palette_index_case(single=True)),
+        BenchmarkCase("palette_index.batch", lambda: palette_index_case(single=False), items=len(lab)),
+    ]
+
+    def session_case():
+        from conversation_session import ConversationSession
+        session = ConversationSession(decay=0.9)
+        return _cycle(synthetic_corpus(1000), session.add_message)
+
+    cases.append(BenchmarkCase("session.add_message", session_case))
+
+    def color_blindness_case():
+        from color_blindness import simulate_image
+        image = rng.integers(0, 256, (1000, 1000, 3), dtype=np.uint8)
+        out = np.empty_like(image)
+        return lambda: simulate_image(image, "deuteranopia", out=out)
+
+    cases.append(BenchmarkCase("color_blindness.image", color_blindness_case, items=1000 * 1000))
+
+    def lexicon_case():
+        import tempfile
+        from lexicon import Lexicon, build_lexicon
+        # 100k willekeurige termen plus de woordenschat van het synthetische corpus
+        letters = np.array(list("abcdefghijklmnopqrstuvwxyzëï"))
+        entries = {"".join(rng.choice(letters, rng.integers(3, 15))): {"blue": 0.5} for _ in range(100000)}
+        entries.update({word: {"red": 1.0} for word in EMOTION_WORDS})
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "benchmark.rmlex")
+        build_lexicon(entries, path)
+        lexicon = Lexicon(path)
+        len(lexicon)  # mapt het bestand; de mapping blijft geldig na het opruimen (POSIX)
+        shutil.rmtree(directory, ignore_errors=True)
+        return _cycle(synthetic_corpus(1000), lexicon.color_weights)
+
+    cases.append(BenchmarkCase("lexicon.color_weights", lexicon_case))
+
+    def agent_core_case(vectorized: bool):
+        from color_agent_core import ColorAgentCore
+        core = ColorAgentCore()
+        tints = [color for tints in core.get_all_colors().values() for color in tints.values()]
+        pairs = [(first, second) for first in tints for second in tints]
+        if vectorized:
+            ratios = np.linspace(0, 1, 1000)
+            return _cycle(pairs, lambda pair: core.mix_colors(*pair, ratios))
+        return _cycle(pairs, lambda pair: core.mix_colors(*pair, 0.3))
+
+    cases += [
+        BenchmarkCase("agent_core.mix_colors", lambda: agent_core_case(vectorized=False)),
+        BenchmarkCase("agent_core.mix_colors.batch", lambda: agent_core_case(vectorized=True), items=1000),
+    ]
+
+    for size_name in sizes:
+        corpus = synthetic_corpus(CORPUS_SIZES[size_name])
+
+        def interpreter_case(corpus=corpus):
+            interpreter = ColorEmotionInterpreter()
+            return _cycle(corpus, interpreter.analyze_context)
+
+        def agent_case(corpus=corpus):
+            agent = AgentWhite()
+            return _cycle(corpus, agent.calculate_balanced_response)
+
+        def legacy_case(corpus=corpus):
+            agent = AgentWhite()
+            return _cycle(corpus, lambda text: legacy_balanced_response(agent, text))
+
+        def batch_case(corpus=corpus):
+            agent = AgentWhite()
+            return lambda: agent.calculate_balanced_responses(corpus)
+
+        cases += [
+            BenchmarkCase(f"interpreter.analyze_context.{size_name}", interpreter_case),
+            BenchmarkCase(f"agent_white.balanced_response.{size_name}", agent_case),
+            BenchmarkCase(f"agent_white.legacy_8x.{size_name}", legacy_case),
+            BenchmarkCase(f"agent_white.batch.{size_name}", batch_case, items=len(corpus)),
+        ]
+
+    def visualization_case():
+        import app
+        agent = AgentWhite()
+        colors = []
+        for context in SAMPLE_CONTEXTS:
+            response = agent.calculate_balanced_response(context)
+            colors += [(fb["color"], fb["confidence"]) for fb in response["agent_feedbacks"].values()]
+            colors.append((response["rainbow_vector"], 1.0))
+        return lambda: app.create_lab_visualization(colors)
+
+    cases.append(BenchmarkCase("app.create_lab_visualization", visualization_case))
+    return cases
+
+
+def run_case(case: BenchmarkCase, min_time: float, min_rounds: int) -> Dict:
+    """Times one case and measures its peak traced memory."""
+    op = case.setup()
+    op()  # opwarmen
+
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < min_rounds or time.perf_counter() < deadline:
+        start = time.perf_counter_ns()
+        op()
+        timings.append(time.perf_counter_ns() - start)
+
+    # Geheugen apart meten; tracemalloc vertraagt de uitvoering
+    tracemalloc.start()
+    op()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.array(timings, dtype=np.float64) / 1e3  # µs per aanroep
+    total_seconds = latencies.sum() / 1e6
+    return {
+        "calls": len(timings),
+        "items_per_call": case.items,
+        "ops_per_sec": len(timings) * case.items / total_seconds,
+        "p50_us": float(np.percentile(latencies, 50)),
+        "p99_us": float(np.percentile(latencies, 99)),
+        "peak_memory_bytes": peak,
+    }
+
+
+def measure_result_memory(corpus: List[str]) -> Dict[str, float]:
+    """Retained bytes per result for dict responses versus a BalancedResponseBatch.
+
+    The corpus strings themselves are allocated before tracing starts, so
+    only the result structures are counted.
+    """
+    agent = AgentWhite()
+    agent.calculate_balanced_responses(corpus[:10])  # opwarmen
+
+    report = {}
+    for name, expand in (("dicts", True), ("batch", False)):
+        tracemalloc.start()
+        results = agent.calculate_balanced_responses(corpus, expand=expand)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report[f"{name}_bytes_per_result"] = current / len(corpus)
+        del results
+    return report
+
+
+def measure_import_time(module: str = "agent_white", runs: int = 7) -> Dict:
+    """Cold import time of module, measured in fresh interpreters.
+
+    Reports the best and median of ``runs`` and which heavy dependencies
+    the import pulled in.
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(elapsed, *[name for name in {HEAVY_MODULES!r} if name in sys.modules])\n"
+    )
+    timings, loaded = [], set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+        timings.append(float(output[0]) * 1e3)
+        loaded.update(output[1:])
+    return {
+        "best_ms": min(timings),
+        "median_ms": float(np.median(timings)),
+        "heavy_modules": sorted(loaded),
+    }
+
+
+def check_stuck_agents(calls: int = 12, deadline: float = 0.3) -> List[str]:
+    """Runs concurrent responses with one agent that never answers in time.
+
+    Every call leaves a thread behind in the hanging agent; a fast agent
+    must still answer on each call, in the thread path and under asyncio.
+    Returns a description of every call where it did not.
+    """
+    import asyncio
+
+    agent = AgentWhite()
+    colors = agent.interpreter.color_names
+    config = {"deadline": deadline, "agents": {
+        colors[0]: {"factory": "agent_registry:DelayedAgent", "options": {"latency": 10.0}},
+        colors[1]: {"factory": "agent_registry:DelayedAgent", "options": {"latency": 0.05}},
+    }}
+    agent = AgentWhite(agent_config=config)
+    problems = []
+    for call in range(calls):
+        missing = agent.calculate_balanced_response_concurrent(SAMPLE_CONTEXTS[0])["missing_agents"]
+        if missing != {colors[0]: "deadline"}:
+            problems.append(f"agents.concurrent call {call + 1}: missing {missing}")
+        missing = asyncio.run(agent.calculate_balanced_response_async(SAMPLE_CONTEXTS[0]))["missing_agents"]
+        if missing != {colors[0]: "deadline"}:
+            problems.append(f"agents.async call {call + 1}: missing {missing}")
+    return problems
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Returns the cases whose ops/sec dropped more than threshold below the baseline."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference or "ops_per_sec" not in reference or "ops_per_sec" not in result:
+            continue
+        change = result["ops_per_sec"] / reference["ops_per_sec"] - 1
+        result["change_vs_baseline"] = change
+        if change < -threshold:
+            regressions.append(f"{name}: {reference['ops_per_sec']:.0f} -> {result['ops_per_sec']:.0f} ops/s ({change:+.1%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-Monster benchmark suite")
+    parser.add_argument("--sizes", nargs="+", choices=list(CORPUS_SIZES), default=["small", "medium"],
+                        help="Synthetic corpus sizes for the interpreter and AgentWhite cases")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum seconds per case")
+    parser.add_argument("--min-rounds", type=int, default=5, help="Minimum calls per case")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a JSON file written by --output")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative ops/sec drop that counts as a regression")
+    parser.add_argument("--import-budget", type=float, metavar="MS",
+                        help="Fail when a cold import of agent_white takes longer (best of 7) "
+                             "or loads NumPy, pandas, plotly or streamlit")
+    parser.add_argument("--agent-check", action="store_true",
+                        help="Fail when an agent that hangs past the deadline delays other agents on later calls")
+    parser.add_argument("--memory", action="store_true",
+                        help="Also report retained memory per result for the largest corpus size")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for case in build_cases(args.sizes):
+        if args.filter not in case.name:
+            continue
+        try:
+            result = run_case(case, args.min_time, args.min_rounds)
+        except ImportError as error:
+            results[case.name] = {"skipped": str(error)}
+            print(f"{case.name:45s} skipped ({error})")
+            continue
+        results[case.name] = result
+        print(f"{case.name:45s} {result['ops_per_sec']:>12,.0f} ops/s  "
+              f"p50 {result['p50_us']:>10.1f} µs  p99 {result['p99_us']:>10.1f} µs  "
+              f"peak {result['peak_memory_bytes'] / 1024:>9.1f} KiB")
+
+    regressions = []
+    if args.filter in "import.agent_white":
+        imported = measure_import_time("agent_white")
+        results["import.agent_white"] = imported
+        print(f"{'import.agent_white':45s} best {imported['best_ms']:>8.1f} ms  median {imported['median_ms']:>8.1f} ms  "
+              f"heavy modules: {', '.join(imported['heavy_modules']) or 'none'}")
+        if args.import_budget is not None:
+            if imported["best_ms"] > args.import_budget:
+                regressions.append(f"import.agent_white: {imported['best_ms']:.1f} ms exceeds the "
+                                   f"{args.import_budget:.1f} ms budget")
+            if imported["heavy_modules"]:
+                regressions.append(f"import.agent_white: loads {', '.join(imported['heavy_modules'])}")
+
+    if args.agent_check:
+        problems = check_stuck_agents()
+        print(f"{'agents.stuck_agent':45s} {'ok' if not problems else f'{len(problems)} failing calls'}")
+        regressions += problems
+
+    if args.memory:
+        size_name = max(args.sizes, key=CORPUS_SIZES.get)
+        memory = measure_result_memory(synthetic_corpus(CORPUS_SIZES[size_name]))
+        results[f"memory.{size_name}"] = memory
+        print(f"{'memory.' + size_name:45s} dicts {memory['dicts_bytes_per_result']:>8.0f} B/result  "
+              f"batch {memory['batch_bytes_per_result']:>8.0f} B/result")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions += compare(results, baseline.get("results", baseline), args.threshold)
+
+    if args.output:
+        report = {
+            "environment": {
+                "python": sys.version.split()[0],
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"- {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
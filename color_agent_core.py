@@ -1,55 +1,180 @@
-import json
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Sequence, Tuple, Optional, Union
+from color_utils import ArrayColorConverter
+from config_snapshot import ConfigSnapshot, load_config
 from dataclasses import dataclass
 
-@dataclass
+# Standaard mengverhoudingen waarvoor de mengtabel wordt voorberekend
+DEFAULT_MIX_RATIOS = tuple(i / 10 for i in range(11))
+
+# Aantal analoge kleuren (stappen van 30 graden) dat per kleur wordt voorberekend
+ANALOGOUS_STEPS = 11
+
+@dataclass(frozen=True, slots=True)
 class Color:
     hex: str
-    cmyk: List[float]
+    cmyk: Tuple[float, float, float, float]
     weight: float
 
+    def __post_init__(self):
+        # Lijsten worden tuples, zodat kleuren onveranderlijk en hashbaar zijn
+        if not isinstance(self.cmyk, tuple):
+            object.__setattr__(self, "cmyk", tuple(self.cmyk))
+
+@dataclass(frozen=True, slots=True)
+class ColorBatch:
+    """Result of ``mix_colors`` with an array of ratios; row ``i`` belongs to ``ratios[i]``."""
+    hex: np.ndarray     # (N,) '<U7'
+    rgb: np.ndarray     # (N, 3) 0-1
+    cmyk: np.ndarray    # (N, 4)
+    weight: np.ndarray  # (N,)
+
+    def __len__(self) -> int:
+        return len(self.weight)
+
+    def __getitem__(self, row: int) -> Color:
+        return Color(hex=str(self.hex[row]), cmyk=tuple(self.cmyk[row].tolist()), weight=float(self.weight[row]))
+
+@dataclass(frozen=True, slots=True)
+class ColorCatalog:
+    """All tints of a config as frozen Colors, with precomputed derived colors.
+
+    ``entries`` lists every (color, tint) in config order and ``index``
+    maps each Color back to its position. ``mixes`` holds the mix of every
+    ordered pair of entries at every ratio in ``ratios``, flattened as
+    ``(first * len(entries) + second) * len(ratios) + ratio``.
+    ``complementary`` and ``analogous`` follow ``entries``.
+    """
+    colors: Mapping[str, Mapping[str, Color]]
+    entries: Tuple[Color, ...]
+    index: Mapping[Color, int]
+    ratios: Tuple[float, ...]
+    ratio_index: Mapping[float, int]
+    mixes: Tuple[Color, ...]
+    complementary: Tuple[Color, ...]
+    analogous: Tuple[Tuple[Color, ...], ...]
+
+    def mix(self, color1: Color, color2: Color, ratio: float) -> Optional[Color]:
+        """The precomputed mix, or None when a color or the ratio is not in the tables."""
+        first = self.index.get(color1)
+        second = self.index.get(color2)
+        step = self.ratio_index.get(ratio)
+        if first is None or second is None or step is None:
+            return None
+        return self.mixes[(first * len(self.entries) + second) * len(self.ratios) + step]
+
+# Eén catalogus per (config bestand, inhoud, mengverhoudingen) per proces
+_catalogs: Dict[Tuple[str, str, Tuple[float, ...]], ColorCatalog] = {}
+
 class ColorAgentCore:
-    def __init__(self, config_path: str = "color_config.json"):
+    def __init__(self, config_path: str = "color_config.json", mix_ratios: Optional[Sequence[float]] = None):
+        """``mix_ratios`` is the grid of ratios for which ``mix_colors`` of two
+        catalog colors is a table lookup (default 0.0, 0.1, ..., 1.0)."""
         self.config_path = config_path
-        self.colors = self._load_colors()
-        
-    def _load_colors(self) -> Dict[str, Dict]:
-        with open(self.config_path, 'r') as f:
-            return json.load(f)['colors']
+        self.mix_ratios = DEFAULT_MIX_RATIOS if mix_ratios is None else tuple(dict.fromkeys(float(r) for r in mix_ratios))
+        snapshot = load_config(config_path)
+        self.colors = snapshot.colors
+        self.catalog = self._load_catalog(snapshot)
+
+
+    def _load_catalog(self, snapshot: ConfigSnapshot) -> ColorCatalog:
+        """Shared catalog for this snapshot and ratio grid; built on first use."""
+        key = (snapshot.path, snapshot.sha256, self.mix_ratios)
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = self._build_catalog(snapshot.colors)
+        return catalog
+
+    def _build_catalog(self, colors: Mapping[str, Mapping]) -> ColorCatalog:
+        catalog_colors = {}
+        entries = []
+        for color_name, color_data in colors.items():
+            tints = {}
+            for tint, tint_data in color_data['sub_tints'].items():
+                tints[tint] = Color(hex=tint_data['hex'], cmyk=tuple(tint_data['cmyk']), weight=tint_data['weight'])
+                entries.append(tints[tint])
+            catalog_colors[color_name] = MappingProxyType(tints)
+
+        # Alle paren en verhoudingen in één keer: (eerste, tweede, verhouding)
+        ratios = np.array(self.mix_ratios, dtype=np.float64)
+        rgb = np.array([self._cmyk_to_rgb(color.cmyk) for color in entries], dtype=np.float64).reshape(-1, 3)
+        weights = np.array([color.weight for color in entries], dtype=np.float64)
+        batch = self._mix_arrays(rgb[:, None, None, :], rgb[None, :, None, :],
+                                 weights[:, None, None], weights[None, :, None], ratios)
+        mixes = tuple(
+            Color(hex=hex_code, cmyk=tuple(cmyk), weight=weight)
+            for hex_code, cmyk, weight in zip(batch.hex.ravel().tolist(), batch.cmyk.reshape(-1, 4).tolist(),
+                                              batch.weight.ravel().tolist())
+        )
+
+        # Een kleur die meerdere keren in de config staat houdt haar eerste positie
+        index = {}
+        for position, color in enumerate(entries):
+            index.setdefault(color, position)
+        return ColorCatalog(
+            colors=MappingProxyType(catalog_colors),
+            entries=tuple(entries),
+            index=MappingProxyType(index),
+            ratios=self.mix_ratios,
+            ratio_index=MappingProxyType({ratio: step for step, ratio in enumerate(self.mix_ratios)}),
+            mixes=mixes,
+            complementary=tuple(self._complementary(color) for color in entries),
+            analogous=tuple(tuple(self._analogous(color, ANALOGOUS_STEPS)) for color in entries),
+        )
     
     def get_color(self, color_name: str, tint: str = "medium") -> Color:
         """Get a specific color and tint combination."""
-        if color_name not in self.colors:
+        if color_name not in self.catalog.colors:
             raise ValueError(f"Color {color_name} not found in configuration")
         
-        color_data = self.colors[color_name]
-        if tint not in color_data['sub_tints']:
+        tints = self.catalog.colors[color_name]
+        if tint not in tints:
             raise ValueError(f"Tint {tint} not found for color {color_name}")
         
-        tint_data = color_data['sub_tints'][tint]
-        return Color(
-            hex=tint_data['hex'],
-            cmyk=tint_data['cmyk'],
-            weight=tint_data['weight']
-        )
+        return tints[tint]
     
-    def get_all_colors(self) -> Dict[str, Dict[str, Color]]:
-        """Get all colors and their tints."""
-        result = {}
-        for color_name, color_data in self.colors.items():
-            result[color_name] = {
-                tint: Color(
-                    hex=tint_data['hex'],
-                    cmyk=tint_data['cmyk'],
-                    weight=tint_data['weight']
-                )
-                for tint, tint_data in color_data['sub_tints'].items()
-            }
-        return result
+    def get_all_colors(self) -> Mapping[str, Mapping[str, Color]]:
+        """Get all colors and their tints (read-only, shared)."""
+        return self.catalog.colors
     
-    def mix_colors(self, color1: Color, color2: Color, ratio: float = 0.5) -> Color:
-        """Mix two colors using CMYK values."""
+    def mix_colors(self, color1: Color, color2: Color,
+                   ratio: Union[float, Sequence[float], np.ndarray] = 0.5) -> Union[Color, ColorBatch]:
+        """Mix two colors using CMYK values.
+
+        Catalog colors mixed at a ratio of the grid come from the mixing
+        table. An array of ratios returns a ColorBatch, computed in one go.
+        """
+        if not isinstance(ratio, (float, int)):
+            ratio = np.asarray(ratio, dtype=np.float64)
+            if ratio.ndim:
+                return self._mix_arrays(np.array(self._cmyk_to_rgb(color1.cmyk)),
+                                        np.array(self._cmyk_to_rgb(color2.cmyk)),
+                                        color1.weight, color2.weight, ratio)
+            ratio = float(ratio)
+        mixed = self.catalog.mix(color1, color2, ratio)
+        if mixed is not None:
+            return mixed
+        return self._mix(color1, color2, ratio)
+
+    def _mix_arrays(self, rgb1: np.ndarray, rgb2: np.ndarray, weight1, weight2, ratio: np.ndarray) -> ColorBatch:
+        """``_mix`` for arrays; RGB has a trailing axis of 3, weights and ratio broadcast against the rest."""
+        rgb_ratio = ratio[..., None]
+        mixed_rgb = rgb1 * (1 - rgb_ratio) + rgb2 * rgb_ratio
+        mixed_weight = np.asarray(weight1 * (1 - ratio) + weight2 * ratio, dtype=np.float64)
+
+        # Zelfde bewerkingen en volgorde als _rgb_to_cmyk en _rgb_to_hex
+        k = 1 - mixed_rgb.max(axis=-1)
+        black = k == 1
+        denominator = np.where(black, 1.0, 1 - k)[..., None]
+        cmy = (1 - mixed_rgb - k[..., None]) / denominator
+        cmyk = np.concatenate([cmy, k[..., None]], axis=-1)
+        cmyk[black] = (0.0, 0.0, 0.0, 1.0)
+        hex_codes = ArrayColorConverter.rgb_to_hex_array((mixed_rgb * 255).astype(np.int64))
+        return ColorBatch(hex=hex_codes, rgb=mixed_rgb, cmyk=cmyk,
+                          weight=np.broadcast_to(mixed_weight, k.shape))
+
+    def _mix(self, color1: Color, color2: Color, ratio: float) -> Color:
         # Convert CMYK to RGB for mixing
         rgb1 = self._cmyk_to_rgb(color1.cmyk)
         rgb2 = self._cmyk_to_rgb(color2.cmyk)
@@ -109,7 +234,13 @@ class ColorAgentCore:
         return f"#{r:02x}{g:02x}{b:02x}"
     
     def get_complementary_color(self, color: Color) -> Color:
-        """Get the complementary color using CMYK values."""
+        """Get the complementary color using CMYK values (precomputed for catalog colors)."""
+        position = self.catalog.index.get(color)
+        if position is not None:
+            return self.catalog.complementary[position]
+        return self._complementary(color)
+
+    def _complementary(self, color: Color) -> Color:
         # Convert to RGB
         rgb = self._cmyk_to_rgb(color.cmyk)
         
@@ -129,7 +260,13 @@ class ColorAgentCore:
         )
     
     def get_analogous_colors(self, color: Color, num_colors: int = 2) -> List[Color]:
-        """Get analogous colors by rotating the hue in CMYK space."""
+        """Get analogous colors by rotating the hue in CMYK space (precomputed for catalog colors)."""
+        position = self.catalog.index.get(color)
+        if position is not None and 0 <= num_colors <= ANALOGOUS_STEPS:
+            return list(self.catalog.analogous[position][:num_colors])
+        return self._analogous(color, num_colors)
+
+    def _analogous(self, color: Color, num_colors: int) -> List[Color]:
         # Convert to RGB
         rgb = self._cmyk_to_rgb(color.cmyk)
         
@@ -0,0 +1,320 @@
+from typing import Callable, Iterable, List, Optional, Sequence, TypeVar
+
+import numpy as np
+
+import color_utils
+from color_utils import EMOTION_LAB, ColorConverter
+
+# NumPy versies van de conversie matrices in color_utils
+_RGB_TO_XYZ = np.array(color_utils._RGB_TO_XYZ)
+_XYZ_TO_RGB = np.array(color_utils._XYZ_TO_RGB)
+_COLOR_BLINDNESS_MATRICES = {
+    name: np.array(matrix) for name, matrix in color_utils._COLOR_BLINDNESS_MATRICES.items()
+}
+
+# ASCII codes van de hex cijfers, voor rgb_to_hex_array
+_HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+
+# sRGB -> lineair RGB voor alle 256 kanaalwaarden (zelfde formule als rgb_to_xyz)
+SRGB_LINEAR_LUT = np.array([
+    v/12.92 if v <= 0.04045 else ((v + 0.055)/1.055) ** 2.4
+    for v in (i/255.0 for i in range(256))
+])
+
+
+def _store(result: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    """Writes result into out when a buffer is given."""
+    if out is None:
+        return result
+    out[...] = result
+    return out
+
+
+Block = TypeVar("Block")
+
+
+def map_blocks(fill: Callable[[Block], None], blocks: Iterable[Block], workers: int = 1):
+    """Calls fill for every block; with ``workers > 1`` from a thread pool.
+
+    Threads pay off because NumPy releases the GIL inside its ufuncs, so
+    blocks that write disjoint parts of one output array run in parallel.
+    Exceptions from fill are re-raised.
+    """
+    if workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _ in pool.map(fill, blocks):
+                pass
+    else:
+        for block in blocks:
+            fill(block)
+
+
+def _in_8bit_range(rgb: np.ndarray) -> bool:
+    """True when every value of an integer array lies in 0..255 (tabellen gelden alleen daar)."""
+    return rgb.size == 0 or (int(rgb.min()) >= 0 and int(rgb.max()) <= 255)
+
+
+class ArrayColorConverter:
+    """NumPy versions of the ColorConverter conversions.
+
+    Every method takes arrays whose last axis holds the color channels
+    (``(N, 3)`` for RGB/XYZ/LAB, ``(N, 4)`` for CMYK; any leading shape
+    works) and replaces the scalar branches with ``np.where``. Methods that
+    return arrays accept an optional ``out=`` buffer of the result shape.
+
+    Float results match the scalar methods within an absolute tolerance of
+    ``TOLERANCE``. Integer results (RGB, hex) are identical, except for
+    channels that land within that tolerance of a rounding boundary.
+    """
+    TOLERANCE = 1e-9
+
+    @staticmethod
+    def _lab_f(t: np.ndarray) -> np.ndarray:
+        """Helper function for LAB conversion."""
+        return np.where(t > ColorConverter.LAB_E, np.cbrt(t), (ColorConverter.LAB_K * t + 16) / 116)
+
+    @staticmethod
+    def _lab_inv_f(t: np.ndarray) -> np.ndarray:
+        """Inverse helper function for LAB conversion."""
+        return np.where(t > ColorConverter.LAB_E, t ** 3, (t - 16/116) / ColorConverter.LAB_K)
+
+    @staticmethod
+    def srgb_to_linear(values: np.ndarray) -> np.ndarray:
+        """Converts sRGB values in 0-1 to linear RGB."""
+        values = np.asarray(values, dtype=np.float64)
+        return np.where(values <= 0.04045, values / 12.92,
+                        ((np.maximum(values, 0.04045) + 0.055) / 1.055) ** 2.4)
+
+    @staticmethod
+    def linear_to_srgb(values: np.ndarray) -> np.ndarray:
+        """Converts linear RGB to sRGB values in 0-1."""
+        values = np.asarray(values, dtype=np.float64)
+        return np.where(values <= 0.0031308, 12.92 * values,
+                        1.055 * np.maximum(values, 0.0031308) ** (1/2.4) - 0.055)
+
+    @staticmethod
+    def rgb_to_xyz(rgb: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Converts RGB (0-255) to XYZ color space."""
+        rgb = np.asarray(rgb)
+        if rgb.dtype.kind in 'ui' and _in_8bit_range(rgb):
+            # 8-bit invoer: linearisatie is een tabel opzoeking
+            linear = SRGB_LINEAR_LUT[rgb]
+        else:
+            linear = ArrayColorConverter.srgb_to_linear(rgb.astype(np.float64) / 255.0)
+        return np.matmul(linear, _RGB_TO_XYZ.T, out=out)
+
+    @staticmethod
+    def xyz_to_lab(xyz: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Converts XYZ to LAB color space."""
+        f = ArrayColorConverter._lab_f(np.asarray(xyz, dtype=np.float64) / np.array(ColorConverter.LAB_WHITE))
+        fx, fy, fz = f[..., 0], f[..., 1], f[..., 2]
+        return _store(np.stack([116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)], axis=-1), out)
+
+    @staticmethod
+    def lab_to_xyz(lab: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Converts LAB to XYZ color space."""
+        lab = np.asarray(lab, dtype=np.float64)
+        fy = (lab[..., 0] + 16) / 116
+        fx = lab[..., 1] / 500 + fy
+        fz = fy - lab[..., 2] / 200
+        f = np.stack([fx, fy, fz], axis=-1)
+        return np.multiply(np.array(ColorConverter.LAB_WHITE), ArrayColorConverter._lab_inv_f(f), out=out)
+
+    @staticmethod
+    def xyz_to_rgb(xyz: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Converts XYZ to 8-bit RGB color space."""
+        linear = np.matmul(np.asarray(xyz, dtype=np.float64), _XYZ_TO_RGB.T)
+        rgb = np.clip(np.rint(ArrayColorConverter.linear_to_srgb(linear) * 255), 0, 255)
+        return _store(rgb.astype(np.int64), out)
+
+    @staticmethod
+    def rgb_to_lab(rgb: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Converts RGB to LAB color space."""
+        lut = ColorConverter._lab_lut
+        rgb = np.asarray(rgb)
+        if lut is not None and rgb.dtype.kind in 'ui' and _in_8bit_range(rgb):
+            return lut.rgb_to_lab_array(rgb, out=out)
+        return ArrayColorConverter.xyz_to_lab(ArrayColorConverter.rgb_to_xyz(rgb), out=out)
+
+    @staticmethod
+    def lab_to_rgb(lab: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Converts LAB to RGB color space."""
+        return ArrayColorConverter.xyz_to_rgb(ArrayColorConverter.lab_to_xyz(lab), out=out)
+
+    @staticmethod
+    def calculate_chroma(a: np.ndarray, b: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Calculates chroma (colorfulness) from LAB a* and b* arrays."""
+        a = np.asarray(a, dtype=np.float64)
+        b = np.asarray(b, dtype=np.float64)
+        return np.sqrt(a*a + b*b, out=out)
+
+    @staticmethod
+    def calculate_hue_angle(a: np.ndarray, b: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Calculates hue angle from LAB a* and b* arrays in degrees."""
+        return np.mod(np.degrees(np.arctan2(b, a)), 360, out=out)
+
+    @staticmethod
+    def rgb_to_cmyk(rgb: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Converteert RGB naar CMYK."""
+        rgb = np.asarray(rgb, dtype=np.float64) / 255.0
+        k = 1 - rgb.max(axis=-1)
+        black = k == 1
+        denominator = np.where(black, 1.0, 1 - k)[..., None]
+        cmy = np.where(black[..., None], 0.0, (1 - rgb - k[..., None]) / denominator)
+        return _store(np.concatenate([cmy, k[..., None]], axis=-1), out)
+
+    @staticmethod
+    def cmyk_to_rgb(cmyk: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Converteert CMYK naar RGB."""
+        cmyk = np.asarray(cmyk, dtype=np.float64)
+        rgb = 255 * (1 - cmyk[..., :3]) * (1 - cmyk[..., 3:])
+        return _store(np.rint(rgb).astype(np.int64), out)
+
+    @staticmethod
+    def hex_to_rgb(hex_colors: Sequence[str], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Converteert een reeks hex kleuren naar een (N, 3) RGB array."""
+        packed = np.array([int(color.lstrip('#'), 16) for color in hex_colors], dtype=np.int64)
+        rgb = np.stack([(packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF], axis=-1)
+        return _store(rgb, out)
+
+    @staticmethod
+    def rgb_to_hex(rgb: np.ndarray) -> List[str]:
+        """Converteert een (N, 3) RGB array naar hex kleuren."""
+        rgb = np.asarray(rgb).reshape(-1, 3)
+        return ['#{:02x}{:02x}{:02x}'.format(*row) for row in rgb.tolist()]
+
+    @staticmethod
+    def rgb_to_hex_array(rgb: np.ndarray) -> np.ndarray:
+        """Converteert (..., 3) RGB naar een array hex strings ('<U7') met dezelfde voorloopvorm.
+
+        Vectoriseert de opmaak via ASCII bytes; veel sneller dan ``rgb_to_hex`` voor grote arrays.
+        """
+        rgb = np.asarray(rgb).astype(np.uint8)
+        chars = np.empty(rgb.shape[:-1] + (7,), dtype=np.uint8)
+        chars[..., 0] = ord('#')
+        chars[..., 1::2] = _HEX_DIGITS[rgb >> 4]
+        chars[..., 2::2] = _HEX_DIGITS[rgb & 0x0F]
+        return chars.view('S7')[..., 0].astype('U7')
+
+    @staticmethod
+    def hex_to_cmyk(hex_colors: Sequence[str], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Converteert een reeks hex kleuren naar CMYK."""
+        return ArrayColorConverter.rgb_to_cmyk(ArrayColorConverter.hex_to_rgb(hex_colors), out=out)
+
+    @staticmethod
+    def cmyk_to_hex(cmyk: np.ndarray) -> List[str]:
+        """Converteert CMYK naar hex kleuren."""
+        return ArrayColorConverter.rgb_to_hex(ArrayColorConverter.cmyk_to_rgb(cmyk))
+
+    @staticmethod
+    def lab_to_hex(lab: np.ndarray) -> List[str]:
+        """Converts LAB to hex colors."""
+        return ArrayColorConverter.rgb_to_hex(ArrayColorConverter.lab_to_rgb(lab))
+
+    @staticmethod
+    def _rotated_palette(lab: np.ndarray, offsets: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Schrijft lab met de tint gedraaid over elk van de offsets (graden) naar out[..., k, 3]."""
+        hue = ArrayColorConverter.calculate_hue_angle(lab[..., 1], lab[..., 2])
+        chroma = ArrayColorConverter.calculate_chroma(lab[..., 1], lab[..., 2])
+        angles = np.radians(np.mod(hue[..., None] + offsets, 360))
+        out[..., 0] = lab[..., 0, None]
+        np.multiply(chroma[..., None], np.cos(angles), out=out[..., 1])
+        np.multiply(chroma[..., None], np.sin(angles), out=out[..., 2])
+        return out
+
+    @staticmethod
+    def _palette_result(palette: np.ndarray, as_hex: bool) -> np.ndarray:
+        if as_hex:
+            return ArrayColorConverter.rgb_to_hex_array(ArrayColorConverter.lab_to_rgb(palette))
+        return palette
+
+    @staticmethod
+    def generate_analogous_palette(lab: np.ndarray, num_colors: int = 5, as_hex: bool = False,
+                                   out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Analogous palettes for (..., 3) LAB colors as (..., num_colors, 3).
+
+        With ``as_hex=True`` the result is a (..., num_colors) array of hex strings.
+        """
+        if num_colors < 2:
+            raise ValueError("num_colors must be at least 2")
+        lab = np.asarray(lab, dtype=np.float64)
+        offsets = (np.arange(num_colors) - num_colors // 2) * (30.0 / (num_colors - 1))
+        if out is None:
+            out = np.empty(lab.shape[:-1] + (num_colors, 3))
+        palette = ArrayColorConverter._rotated_palette(lab, offsets, out)
+        return ArrayColorConverter._palette_result(palette, as_hex)
+
+    @staticmethod
+    def generate_complementary_palette(lab: np.ndarray, as_hex: bool = False,
+                                       out: Optional[np.ndarray] = None) -> np.ndarray:
+        """The color and its complement for (..., 3) LAB colors as (..., 2, 3)."""
+        lab = np.asarray(lab, dtype=np.float64)
+        if out is None:
+            out = np.empty(lab.shape[:-1] + (2, 3))
+        out[..., 0, :] = lab
+        ArrayColorConverter._rotated_palette(lab, np.array([180.0]), out[..., 1:, :])
+        return ArrayColorConverter._palette_result(out, as_hex)
+
+    @staticmethod
+    def generate_triadic_palette(lab: np.ndarray, as_hex: bool = False,
+                                 out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Triadic palettes for (..., 3) LAB colors as (..., 3, 3)."""
+        lab = np.asarray(lab, dtype=np.float64)
+        if out is None:
+            out = np.empty(lab.shape[:-1] + (3, 3))
+        palette = ArrayColorConverter._rotated_palette(lab, np.array([0.0, 120.0, 240.0]), out)
+        return ArrayColorConverter._palette_result(palette, as_hex)
+
+    @staticmethod
+    def generate_emotion_palette(weights: np.ndarray, emotion_names: Sequence[str], num_colors: int = 5,
+                                 as_hex: bool = False, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Emotion palettes for an (..., E) weight matrix whose columns follow emotion_names.
+
+        Matches ``ColorConverter.generate_emotion_palette`` row by row, e.g.
+        for ``BalancedResponseBatch.emotional_scores`` and ``emotion_names``.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        table = np.array([EMOTION_LAB.get(name, (0, 0, 0)) for name in emotion_names], dtype=np.float64)
+        total = weights.sum(axis=-1)
+        has_weight = total != 0
+        base = (weights @ table) / np.where(has_weight, total, 1.0)[..., None]
+        palette = ArrayColorConverter.generate_analogous_palette(base, num_colors, out=out)
+        palette[~has_weight] = (60.0, 0.0, 0.0)  # Default to neutral gray
+        return ArrayColorConverter._palette_result(palette, as_hex)
+
+    @staticmethod
+    def blend_cmyk_colors(colors: np.ndarray, weights: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Blendt (M, 4) CMYK kleuren met een (N, M) gewichtsmatrix naar (N, 4)."""
+        colors = np.asarray(colors, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+        total = weights.sum(axis=-1, keepdims=True)
+        normalized = np.divide(weights, total, out=np.zeros_like(weights), where=total != 0)
+        return np.matmul(normalized, colors, out=out)
+
+    @staticmethod
+    def check_color_contrast(lab1: np.ndarray, lab2: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Calculate color contrast ratios between two arrays of LAB colors."""
+        def get_luminance(rgb):
+            rgb = rgb / 255
+            linear = np.where(rgb <= 0.03928, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+            return 0.2126 * linear[..., 0] + 0.7152 * linear[..., 1] + 0.0722 * linear[..., 2]
+
+        l1 = get_luminance(ArrayColorConverter.lab_to_rgb(lab1))
+        l2 = get_luminance(ArrayColorConverter.lab_to_rgb(lab2))
+        return np.divide(np.maximum(l1, l2) + 0.05, np.minimum(l1, l2) + 0.05, out=out)
+
+    @staticmethod
+    def simulate_color_blindness(lab: np.ndarray, type: str = 'deuteranopia',
+                                 out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Simulate color blindness for an array of LAB colors."""
+        lab = np.asarray(lab, dtype=np.float64)
+        if type not in _COLOR_BLINDNESS_MATRICES:
+            return _store(lab.copy(), out)
+        rgb = ArrayColorConverter.lab_to_rgb(lab).astype(np.float64)
+        r, g, b = rgb[..., 0, None], rgb[..., 1, None], rgb[..., 2, None]
+        # Zelfde optelvolgorde als de scalaire versie, zodat int() afkapping overeenkomt
+        matrix = _COLOR_BLINDNESS_MATRICES[type]
+        simulated = np.trunc(r * matrix[:, 0] + g * matrix[:, 1] + b * matrix[:, 2])
+        return ArrayColorConverter.rgb_to_lab(simulated, out=out)
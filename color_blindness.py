@@ -0,0 +1,196 @@
+import argparse
+import os
+import sys
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from color_arrays import _COLOR_BLINDNESS_MATRICES, SRGB_LINEAR_LUT, ArrayColorConverter, map_blocks
+
+COLOR_BLINDNESS_TYPES = tuple(_COLOR_BLINDNESS_MATRICES)
+
+# Pixels per chunk: ~1M pixels houdt de float32 tussenresultaten rond 12 MB
+DEFAULT_CHUNK_PIXELS = 1 << 20
+
+# 8-bit sRGB -> lineair RGB, en lineair (16-bit gekwantiseerd) -> 8-bit sRGB
+_DECODE_LUT = SRGB_LINEAR_LUT.astype(np.float32)
+_ENCODE_STEPS = 65535
+_ENCODE_LUT = np.rint(255 * ArrayColorConverter.linear_to_srgb(np.linspace(0.0, 1.0, _ENCODE_STEPS + 1))).astype(np.uint8)
+
+
+# Volle schaal per ondersteund integer type; floats zijn sRGB in 0-1
+_INTEGER_SCALE = {np.dtype(np.uint8): 255, np.dtype(np.uint16): 65535}
+
+
+def _check_dtype(dtype, name: str = "image"):
+    dtype = np.dtype(dtype)
+    if dtype not in _INTEGER_SCALE and not np.issubdtype(dtype, np.floating):
+        raise ValueError(f"{name} must be uint8, uint16 or floating point sRGB, got {dtype}")
+
+
+def _to_linear(pixels: np.ndarray) -> np.ndarray:
+    """sRGB pixels (uint8 0-255, uint16 0-65535 or float 0-1) to float32 linear RGB."""
+    if pixels.dtype == np.uint8:
+        return _DECODE_LUT[pixels]
+    if pixels.dtype == np.uint16:
+        return ArrayColorConverter.srgb_to_linear(pixels / 65535.0).astype(np.float32)
+    return ArrayColorConverter.srgb_to_linear(np.clip(pixels, 0.0, 1.0)).astype(np.float32)
+
+
+def _from_linear(linear: np.ndarray, dtype) -> np.ndarray:
+    """Linear RGB in 0-1 to sRGB of dtype (uint8 0-255, uint16 0-65535 or float 0-1)."""
+    if dtype == np.uint8:
+        return _ENCODE_LUT[np.rint(linear * _ENCODE_STEPS).astype(np.int32)]
+    if dtype == np.uint16:
+        return np.rint(ArrayColorConverter.linear_to_srgb(linear) * 65535).astype(np.uint16)
+    return ArrayColorConverter.linear_to_srgb(linear)
+
+
+def _output_dtype(dtype) -> np.dtype:
+    """Integer images keep their type; float images come back as float32."""
+    dtype = np.dtype(dtype)
+    return dtype if dtype in _INTEGER_SCALE else np.dtype(np.float32)
+
+
+def _chunk_rows(shape: Tuple[int, ...], chunk_pixels: int) -> int:
+    return max(1, chunk_pixels // max(shape[1], 1))
+
+
+def iter_chunks(height: int, rows: int) -> Iterator[slice]:
+    """Row bands of at most ``rows`` rows covering an image of the given height."""
+    for start in range(0, height, rows):
+        yield slice(start, min(start + rows, height))
+
+
+def simulate_image(image: np.ndarray, type: str = 'deuteranopia', out: Optional[np.ndarray] = None,
+                   chunk_pixels: int = DEFAULT_CHUNK_PIXELS, workers: int = 1) -> np.ndarray:
+    """Simulates color blindness on an (H, W, 3) or (H, W, 4) sRGB image.
+
+    Unlike ``ColorConverter.simulate_color_blindness``, which works per LAB
+    color on gamma-encoded RGB, the matrix is applied in linear RGB: pixels
+    are decoded, multiplied by the 3x3 matrix, clipped and re-encoded.
+    uint8 images use lookup tables both ways, uint16 images are scaled by
+    65535 and float images are sRGB in 0-1; other dtypes raise ValueError.
+    An alpha channel is copied unchanged. Unknown types copy the image, as
+    the scalar version returns the color unchanged.
+
+    The image is processed in row bands of about ``chunk_pixels`` pixels,
+    so ``image`` and ``out`` may be ``np.memmap`` arrays larger than RAM.
+    Bands write disjoint rows of ``out``, so ``workers > 1`` simulates
+    them on that many threads (see ``map_blocks``).
+    """
+    image = np.asarray(image)
+    if image.ndim != 3 or image.shape[2] not in (3, 4):
+        raise ValueError(f"expected an (H, W, 3) or (H, W, 4) image, got shape {image.shape}")
+    _check_dtype(image.dtype)
+    if out is None:
+        out = np.empty(image.shape, dtype=_output_dtype(image.dtype))
+    elif out.shape != image.shape:
+        raise ValueError(f"out has shape {out.shape}, expected {image.shape}")
+    else:
+        _check_dtype(out.dtype, "out")
+
+    matrix = _COLOR_BLINDNESS_MATRICES.get(type)
+    matrix_t = None if matrix is None else np.ascontiguousarray(matrix.T, dtype=np.float32)
+
+    def fill(rows: slice):
+        pixels = image[rows]
+        if matrix_t is None:
+            out[rows] = pixels
+            return
+        linear = _to_linear(pixels[..., :3]) @ matrix_t
+        np.clip(linear, 0.0, 1.0, out=linear)
+        out[rows, :, :3] = _from_linear(linear, out.dtype)
+        if image.shape[2] == 4:
+            out[rows, :, 3] = pixels[..., 3]
+
+    map_blocks(fill, iter_chunks(image.shape[0], _chunk_rows(image.shape, chunk_pixels)), workers)
+    return out
+
+
+def load_image(path: str) -> np.ndarray:
+    """Loads an image: ``.npy`` files are memory-mapped read-only, others are read with Pillow."""
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    from PIL import Image  # optioneel, alleen nodig voor PNG/JPEG
+
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGBA" if "A" in img.getbands() else "RGB"))
+
+
+def simulate_file(src: str, dst: str, type: str = 'deuteranopia',
+                  chunk_pixels: int = DEFAULT_CHUNK_PIXELS, workers: int = 1) -> Tuple[int, ...]:
+    """Simulates color blindness from file src to file dst; returns the image shape.
+
+    When dst is a ``.npy`` file the result is written through a memory
+    map, so with a ``.npy`` source neither image has to fit in memory.
+    """
+    image = load_image(src)
+    _check_dtype(image.dtype)
+    dtype = _output_dtype(image.dtype)
+    if dst.endswith(".npy"):
+        out = np.lib.format.open_memmap(dst, mode="w+", dtype=dtype, shape=image.shape)
+        simulate_image(image, type, out=out, chunk_pixels=chunk_pixels, workers=workers)
+        out.flush()
+        del out
+    else:
+        from PIL import Image
+
+        out = simulate_image(image, type, chunk_pixels=chunk_pixels, workers=workers)
+        if out.dtype == np.uint16:
+            out = np.rint(out / 257.0).astype(np.uint8)
+        elif out.dtype != np.uint8:
+            out = np.rint(out * 255).astype(np.uint8)
+        Image.fromarray(out).save(dst)
+    return image.shape
+
+
+def benchmark(height: int, width: int, type: str = 'deuteranopia', chunk_pixels: int = DEFAULT_CHUNK_PIXELS,
+              workers: int = 1, seed: int = 42) -> Dict:
+    """Times one pass over a random (height, width, 3) uint8 image."""
+    image = np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    out = np.empty_like(image)
+    start = time.perf_counter()
+    simulate_image(image, type, out=out, chunk_pixels=chunk_pixels, workers=workers)
+    elapsed = time.perf_counter() - start
+    return {"pixels": height * width, "seconds": elapsed, "pixels_per_sec": height * width / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate color blindness on images")
+    parser.add_argument("input", nargs="?", help="Image file (.npy is memory-mapped; PNG/JPEG need Pillow)")
+    parser.add_argument("output", nargs="?", help="Output file; '{type}' is replaced by the simulation type")
+    parser.add_argument("--type", choices=list(COLOR_BLINDNESS_TYPES) + ["all"], default="deuteranopia")
+    parser.add_argument("--chunk-pixels", type=int, default=DEFAULT_CHUNK_PIXELS, help="Pixels per processed band")
+    parser.add_argument("--workers", type=int, default=1, help="Threads processing bands in parallel")
+    parser.add_argument("--benchmark", metavar="HxW", help="Time a random HxW image instead")
+    args = parser.parse_args()
+    types = COLOR_BLINDNESS_TYPES if args.type == "all" else (args.type,)
+
+    if args.benchmark:
+        height, width = (int(v) for v in args.benchmark.lower().split("x"))
+        for type in types:
+            result = benchmark(height, width, type, args.chunk_pixels, args.workers)
+            print(f"{type} {height}x{width}: {result['seconds']:.3f} s "
+                  f"({result['pixels_per_sec'] / 1e6:.1f} M pixels/s)")
+        return
+
+    if not args.input or not args.output:
+        parser.error("input and output are required unless --benchmark is given")
+    if len(types) > 1 and "{type}" not in args.output:
+        root, ext = os.path.splitext(args.output)
+        args.output = f"{root}_{{type}}{ext}"
+    try:
+        for type in types:
+            dst = args.output.replace("{type}", type)
+            shape = simulate_file(args.input, dst, type, args.chunk_pixels, args.workers)
+            print(f"{type}: {shape[1]}x{shape[0]} -> {dst}")
+    except ImportError:
+        print("Reading or writing PNG/JPEG requires Pillow (pip install pillow); .npy works without it",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,56 @@
+import math
 from typing import Tuple, Dict, List
-import numpy as np
+
+# Conversie matrices (gedeeld door de scalaire en array methodes)
+_RGB_TO_XYZ = [
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041]
+]
+_XYZ_TO_RGB = [
+    [3.2404542, -1.5371385, -0.4985314],
+    [-0.9692660, 1.8760108, 0.0415560],
+    [0.0556434, -0.2040259, 1.0572252]
+]
+_COLOR_BLINDNESS_MATRICES = {
+    'protanopia': [
+        [0.567, 0.433, 0],
+        [0.558, 0.442, 0],
+        [0, 0.242, 0.758]
+    ],
+    'deuteranopia': [
+        [0.625, 0.375, 0],
+        [0.7, 0.3, 0],
+        [0, 0.3, 0.7]
+    ],
+    'tritanopia': [
+        [0.95, 0.05, 0],
+        [0, 0.433, 0.567],
+        [0, 0.475, 0.525]
+    ]
+}
+
+# Map emotions to LAB color ranges (generate_emotion_palette)
+EMOTION_LAB = {
+    'blij': (70, 20, 60),      # Bright yellow
+    'kwaad': (50, 60, -20),    # Deep red
+    'verdriet': (40, -20, -40), # Deep blue
+    'gelukkig': (80, 10, 40),   # Light yellow
+    'neutraal': (60, 0, 0),     # Gray
+    'verward': (50, -30, 30),   # Purple
+    'overweldigd': (30, 0, 0)   # Dark gray
+}
+
+# De NumPy versies staan in color_arrays en worden pas bij het eerste gebruik geladen
+_ARRAY_EXPORTS = ("ArrayColorConverter", "SRGB_LINEAR_LUT")
+
+
+def __getattr__(name: str):
+    if name in _ARRAY_EXPORTS:
+        import color_arrays
+        return getattr(color_arrays, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class ColorConverter:
     # CIE 1976 LAB constants
@@ -7,6 +58,14 @@ class ColorConverter:
     LAB_K = 903.3
     LAB_WHITE = (0.95047, 1.0, 1.08883)  # D65 illuminant
 
+    # Optionele sRGB -> LAB opzoektabel (zie lab_lut.LabLookupTable)
+    _lab_lut = None
+
+    @staticmethod
+    def use_lab_lut(table) -> None:
+        """Laat rgb_to_lab een vooraf berekende tabel gebruiken (None schakelt uit)."""
+        ColorConverter._lab_lut = table
+
     @staticmethod
     def _lab_f(t: float) -> float:
         """Helper function for LAB conversion."""
@@ -96,6 +155,10 @@ class ColorConverter:
     @staticmethod
     def rgb_to_lab(r: int, g: int, b: int) -> Tuple[float, float, float]:
         """Converts RGB to LAB color space."""
+        lut = ColorConverter._lab_lut
+        if (lut is not None and type(r) is int and type(g) is int and type(b) is int
+                and 0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+            return lut.rgb_to_lab(r, g, b)
         x, y, z = ColorConverter.rgb_to_xyz(r, g, b)
         return ColorConverter.xyz_to_lab(x, y, z)
 
@@ -108,12 +171,12 @@ class ColorConverter:
     @staticmethod
     def calculate_chroma(a: float, b: float) -> float:
         """Calculates chroma (colorfulness) from LAB a* and b* values."""
-        return np.sqrt(a*a + b*b)
+        return math.sqrt(a*a + b*b)
 
     @staticmethod
     def calculate_hue_angle(a: float, b: float) -> float:
         """Calculates hue angle from LAB a* and b* values in degrees."""
-        return np.degrees(np.arctan2(b, a)) % 360
+        return math.degrees(math.atan2(b, a)) % 360
 
     @staticmethod
     def rgb_to_cmyk(r: int, g: int, b: int) -> Tuple[float, float, float, float]:
@@ -214,8 +277,8 @@ class ColorConverter:
         angle_step = 30.0 / (num_colors - 1)
         for i in range(num_colors):
             new_angle = (hue_angle + (i - num_colors//2) * angle_step) % 360
-            new_a = chroma * np.cos(np.radians(new_angle))
-            new_b = chroma * np.sin(np.radians(new_angle))
+            new_a = chroma * math.cos(math.radians(new_angle))
+            new_b = chroma * math.sin(math.radians(new_angle))
             palette.append((l, new_a, new_b))
         
         return palette
@@ -228,8 +291,8 @@ class ColorConverter:
         
         # Generate complementary color (180 degrees opposite)
         comp_angle = (hue_angle + 180) % 360
-        comp_a = chroma * np.cos(np.radians(comp_angle))
-        comp_b = chroma * np.sin(np.radians(comp_angle))
+        comp_a = chroma * math.cos(math.radians(comp_angle))
+        comp_b = chroma * math.sin(math.radians(comp_angle))
         
         return [(l, a, b), (l, comp_a, comp_b)]
 
@@ -244,8 +307,8 @@ class ColorConverter:
         palette = []
         
         for angle in angles:
-            new_a = chroma * np.cos(np.radians(angle))
-            new_b = chroma * np.sin(np.radians(angle))
+            new_a = chroma * math.cos(math.radians(angle))
+            new_b = chroma * math.sin(math.radians(angle))
             palette.append((l, new_a, new_b))
         
         return palette
@@ -253,16 +316,7 @@ class ColorConverter:
     @staticmethod
     def generate_emotion_palette(emotions: Dict[str, float], num_colors: int = 5) -> List[Tuple[float, float, float]]:
         """Generate a color palette based on emotional scores."""
-        # Map emotions to LAB color ranges
-        emotion_to_lab = {
-            'blij': (70, 20, 60),      # Bright yellow
-            'kwaad': (50, 60, -20),    # Deep red
-            'verdriet': (40, -20, -40), # Deep blue
-            'gelukkig': (80, 10, 40),   # Light yellow
-            'neutraal': (60, 0, 0),     # Gray
-            'verward': (50, -30, 30),   # Purple
-            'overweldigd': (30, 0, 0)   # Dark gray
-        }
+        emotion_to_lab = EMOTION_LAB
         
         # Calculate weighted average LAB values
         total_weight = sum(emotions.values())
@@ -312,30 +366,11 @@ class ColorConverter:
         rgb = ColorConverter.lab_to_rgb(*lab)
         r, g, b = rgb
         
-        # Color blindness simulation matrices
-        matrices = {
-            'protanopia': [
-                [0.567, 0.433, 0],
-                [0.558, 0.442, 0],
-                [0, 0.242, 0.758]
-            ],
-            'deuteranopia': [
-                [0.625, 0.375, 0],
-                [0.7, 0.3, 0],
-                [0, 0.3, 0.7]
-            ],
-            'tritanopia': [
-                [0.95, 0.05, 0],
-                [0, 0.433, 0.567],
-                [0, 0.475, 0.525]
-            ]
-        }
-        
-        if type not in matrices:
+        if type not in _COLOR_BLINDNESS_MATRICES:
             return lab
         
         # Apply color blindness simulation
-        matrix = matrices[type]
+        matrix = _COLOR_BLINDNESS_MATRICES[type]
         new_r = r * matrix[0][0] + g * matrix[0][1] + b * matrix[0][2]
         new_g = r * matrix[1][0] + g * matrix[1][1] + b * matrix[1][2]
         new_b = r * matrix[2][0] + g * matrix[2][1] + b * matrix[2][2]
@@ -349,6 +384,7 @@ class ColorConverter:
         r, g, b = ColorConverter.lab_to_rgb(l, a, b)
         return '#{:02x}{:02x}{:02x}'.format(r, g, b)
 
+
 # Voorbeeld gebruik
 if __name__ == "__main__":
     converter = ColorConverter()
@@ -1,9 +1,21 @@
-import json
-from typing import Dict, List, Tuple
-import numpy as np
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 from color_utils import ColorConverter
+from config_snapshot import TINT_TYPES, ConfigSnapshot, load_config
+from keyword_matcher import KeywordMatcher
+from lazy_import import LazyModule
+from result_cache import MISSING, ResultCache, normalize_key
+
+# NumPy wordt pas geladen wanneer de batch tabellen nodig zijn
+np = LazyModule("numpy")
+
+# Gewicht dat een kleur krijgt wanneer een van haar trefwoorden in de context voorkomt
+KEYWORD_WEIGHT = 30.0
 
 class Strategy(Enum):
     DIRECT = "direct"
@@ -11,17 +23,48 @@ class Strategy(Enum):
     EMPATHIC = "empathetic"
     CAUTIOUS = "cautious"
 
-@dataclass
+# Compacte integer code per strategie (index in deze tuple), voor kolomgewijze opslag
+STRATEGIES = tuple(Strategy)
+STRATEGY_CODES = {strategy: code for code, strategy in enumerate(STRATEGIES)}
+
+@dataclass(slots=True)
 class AgentDecision:
     strategy: Strategy
     fallback: bool
     rainbow_vector: str
     cmyk_vector: Tuple[float, float, float, float]
 
+@dataclass(slots=True)
+class CompiledTables:
+    """Opzoektabellen uit één config snapshot en de agent tabel.
+
+    Een herladen config bouwt een nieuwe set en publiceert die met één
+    toewijzing, zodat threads die tegelijk analyseren altijd een complete
+    set zien. ``arrays`` (de NumPy versies) wordt bij het eerste gebruik
+    gevuld.
+    """
+    color_names: List[str]
+    color_index: Dict[str, int]
+    emotion_names: List[str]
+    emotion_index: Dict[str, int]
+    agent_emotions: List[List[int]]
+    tint_weights: List[Tuple[float, ...]]
+    color_tint_weight: List[float]
+    score_terms: List[List[Tuple[int, float]]]
+    agent_cmyk: List[Tuple[float, float, float, float]]
+    arrays: Optional[Dict[str, "np.ndarray"]] = None
+
 class ColorEmotionInterpreter:
-    def __init__(self, config_path: str = "color_config.json"):
-        with open(config_path, 'r') as f:
-            self.config = json.load(f)
+    # Volgorde van de sub-tints in tint_weights
+    TINT_TYPES = TINT_TYPES
+
+    def __init__(self, config_path: str = "color_config.json", cache_size: int = 0,
+                 cache_ttl: Optional[float] = None, config_check_interval: float = 1.0,
+                 lexicon: Optional[Union[str, "Lexicon"]] = None, snapshot: Optional[ConfigSnapshot] = None):
+        self.config_path = config_path
+        # Gedeelde, onveranderlijke snapshot van color_config.json; een meegegeven
+        # snapshot (bv. van het ouderproces) bespaart het lezen van het bestand
+        self.snapshot = load_config(config_path) if snapshot is None else snapshot
         
         self.converter = ColorConverter()
         
@@ -43,47 +86,247 @@ class ColorEmotionInterpreter:
                     "color": "#00FF00",
                     "cmyk": (1.0, 0.0, 1.0, 0.0),  # Cyan + Yellow
                     "emotion": ["blij", "gelukkig", "neutraal"],
+                    "keywords": ["blij", "gelukkig"],  # Trefwoorden die deze agent activeren
                     "weight": 0.0
                 },
                 "yellow": {
                     "color": "#FFFF00",
                     "cmyk": (0.0, 0.0, 1.0, 0.0),  # Yellow
                     "emotion": ["ongeloof", "walging", "afkeer"],
+                    "keywords": ["ongeloof"],
                     "weight": 0.0
                 },
                 "blue": {
                     "color": "#0000FF",
                     "cmyk": (1.0, 1.0, 0.0, 0.0),  # Cyan + Magenta
                     "emotion": ["verward", "gekwetst", "verdriet"],
+                    "keywords": ["verdriet", "gekwetst"],
                     "weight": 0.0
                 },
                 "purple": {
                     "color": "#800080",
                     "cmyk": (0.5, 1.0, 0.0, 0.0),  # Magenta + Cyan
                     "emotion": ["jaloezie", "ego", "miscommunicatie"],
+                    "keywords": ["jaloezie"],
                     "weight": 0.0
                 },
                 "pink": {
                     "color": "#FFC0CB",
                     "cmyk": (0.0, 0.25, 0.2, 0.0),  # Light Magenta + Yellow
                     "emotion": ["schuld", "negatief", "naïef"],
+                    "keywords": ["schuld"],
                     "weight": 0.0
                 },
                 "red": {
                     "color": "#FF0000",
                     "cmyk": (0.0, 1.0, 1.0, 0.0),  # Magenta + Yellow
                     "emotion": ["verraad", "kwaad", "woede"],
+                    "keywords": ["kwaad", "woede"],
                     "weight": 0.0
                 },
                 "gray": {
                     "color": "#808080",
                     "cmyk": (0.0, 0.0, 0.0, 0.5),  # 50% Black
                     "emotion": ["overweldigd", "saturatie", "ambivalentie"],
+                    "keywords": ["overweldigd"],
                     "weight": 0.0
                 }
             }
         }
 
+        # Compileer alle trefwoorden één keer tot een automaat
+        self.keyword_matcher = self._build_keyword_matcher()
+
+        # Optioneel gewogen lexicon (pad of Lexicon), pas bij de eerste opzoeking gemapt
+        if isinstance(lexicon, str):
+            from lexicon import Lexicon
+            lexicon = Lexicon(lexicon)
+        self.lexicon = lexicon
+
+        # Compileer config en agent tabel tot opzoektabellen
+        self._compile_tables()
+
+        # Optionele resultaat cache (cache_size=0 schakelt hem uit)
+        self.cache = ResultCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self.config_version = 0
+        self.config_check_interval = config_check_interval
+        self._next_config_check = time.monotonic() + config_check_interval
+
+    @property
+    def config(self) -> Mapping[str, Any]:
+        """De geparste color_config.json, read-only; volgt de actuele snapshot."""
+        return self.snapshot.config
+
+    def _config_file_stamp(self) -> Optional[Tuple[int, int]]:
+        """Wijzigingstijd en grootte van het config bestand."""
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_config(self):
+        """Haalt de actuele config snapshot op, hercompileert de tabellen en leegt de cache."""
+        self.snapshot = load_config(self.config_path)
+        self._compile_tables()
+        self.config_version += 1
+        if self.cache is not None:
+            self.cache.clear()
+
+    def check_config(self) -> bool:
+        """Herlaadt de config als het bestand gewijzigd is; controleert hoogstens eens per interval."""
+        now = time.monotonic()
+        if now < self._next_config_check:
+            return False
+        self._next_config_check = now + self.config_check_interval
+        if self._config_file_stamp() == self.snapshot.stamp:
+            return False
+        self.reload_config()
+        return True
+
+    def _compile_tables(self):
+        """Zet color_config.json en de agent tabel om naar opzoektabellen.
+
+        De kolomvolgorde is stabiel: ``color_names`` volgt de volgorde van de
+        agents en ``emotion_names`` de volgorde waarin emoties daar voor het
+        eerst voorkomen. Batch en kolomgewijze uitvoer gebruiken dezelfde
+        indices. De NumPy versies (``tint_weights``, ``score_matrix``,
+        ``agent_cmyk``) worden pas bij het eerste gebruik opgebouwd. Alles
+        wordt in lokale variabelen opgebouwd en pas aan het eind als één
+        ``CompiledTables`` gepubliceerd.
+        """
+        agents = self.agent_config["agents"]
+        snapshot = self.snapshot
+        color_names = list(agents)
+
+        emotion_names: List[str] = []
+        emotion_index: Dict[str, int] = {}
+        for agent in agents.values():
+            for emotion in agent["emotion"]:
+                if emotion not in emotion_index:
+                    emotion_index[emotion] = len(emotion_names)
+                    emotion_names.append(emotion)
+
+        # Emotie indices per agent (kleur index -> oplopende, unieke emotie indices)
+        agent_emotions = [sorted({emotion_index[emotion] for emotion in agent["emotion"]}) for agent in agents.values()]
+
+        # Som van de sub-tint gewichten per kleur
+        tint_weights = [snapshot.tint_weights[color] for color in color_names]
+        color_tint_weight = [sum(weights) for weights in tint_weights]
+
+        # Per emotie de (kleur index, tint-gewicht) paren: de niet-nul kolom van score_matrix
+        score_terms: List[List[Tuple[int, float]]] = [[] for _ in emotion_names]
+        for column, emotions in enumerate(agent_emotions):
+            for emotion in emotions:
+                score_terms[emotion].append((column, color_tint_weight[column]))
+
+        self.tables = CompiledTables(
+            color_names=color_names,
+            color_index={color: i for i, color in enumerate(color_names)},
+            emotion_names=emotion_names,
+            emotion_index=emotion_index,
+            agent_emotions=agent_emotions,
+            tint_weights=tint_weights,
+            color_tint_weight=color_tint_weight,
+            score_terms=score_terms,
+            agent_cmyk=[tuple(agents[color]["cmyk"]) for color in color_names],
+        )
+
+    @property
+    def color_names(self) -> List[str]:
+        return self.tables.color_names
+
+    @property
+    def color_index(self) -> Dict[str, int]:
+        return self.tables.color_index
+
+    @property
+    def emotion_names(self) -> List[str]:
+        return self.tables.emotion_names
+
+    @property
+    def emotion_index(self) -> Dict[str, int]:
+        return self.tables.emotion_index
+
+    @property
+    def agent_emotions(self) -> List[List[int]]:
+        return self.tables.agent_emotions
+
+    @property
+    def color_tint_weight(self) -> List[float]:
+        return self.tables.color_tint_weight
+
+    def array_tables(self, tables: Optional[CompiledTables] = None) -> Dict[str, np.ndarray]:
+        """De NumPy tabellen voor de batch berekeningen, opgebouwd bij het eerste gebruik.
+
+        Geef ``tables`` mee om de arrays van een eerder opgehaalde set te
+        krijgen, ook als de config intussen herladen is.
+        """
+        tables = self.tables if tables is None else tables
+        arrays = tables.arrays
+        if arrays is None:
+            # Score matrix (kleuren x emoties): som van tint-gewichten waar de emotie bij de kleur hoort
+            score_matrix = np.zeros((len(tables.color_names), len(tables.emotion_names)))
+            for column, emotions in enumerate(tables.agent_emotions):
+                score_matrix[column, emotions] = tables.color_tint_weight[column]
+            arrays = tables.arrays = {
+                "tint_weights": np.array(tables.tint_weights, dtype=np.float64),
+                "score_matrix": score_matrix,
+                "agent_cmyk": np.array(tables.agent_cmyk, dtype=np.float64),
+            }
+        return arrays
+
+    def attach_tables(self, arrays: Dict[str, np.ndarray], keyword_matcher: Optional[KeywordMatcher] = None,
+                      color_names: Optional[List[str]] = None, emotion_names: Optional[List[str]] = None):
+        """Gebruikt extern gebouwde tabellen (bv. views op gedeeld geheugen) in plaats van eigen kopieën.
+
+        ``arrays`` bevat ``tint_weights``, ``score_matrix`` en ``agent_cmyk``.
+        De kolomvolgorde moet overeenkomen met die van deze interpreter; geef
+        ``color_names`` en ``emotion_names`` mee om dat te controleren. Een
+        herladen config bouwt weer eigen tabellen.
+        """
+        tables = self.tables
+        if color_names is not None and list(color_names) != tables.color_names:
+            raise ValueError("Shared tables have a different color order than this interpreter")
+        if emotion_names is not None and list(emotion_names) != tables.emotion_names:
+            raise ValueError("Shared tables have a different emotion order than this interpreter")
+        tables.arrays = {name: arrays[name] for name in ("tint_weights", "score_matrix", "agent_cmyk")}
+        if keyword_matcher is not None:
+            self.keyword_matcher = keyword_matcher
+
+    @property
+    def tint_weights(self) -> np.ndarray:
+        """(kleuren, tints) sub-tint gewichten in ``TINT_TYPES`` volgorde."""
+        return self.array_tables()["tint_weights"]
+
+    @property
+    def score_matrix(self) -> np.ndarray:
+        return self.array_tables()["score_matrix"]
+
+    @property
+    def agent_cmyk(self) -> np.ndarray:
+        return self.array_tables()["agent_cmyk"]
+
+    def color_weight_vector(self, color_weights: Dict[str, float]) -> np.ndarray:
+        """Zet een dict met kleurgewichten om naar een vector in ``color_names`` volgorde."""
+        return np.array([color_weights.get(color, 0.0) for color in self.color_names], dtype=np.float64)
+
+    def emotional_score_matrix(self, weights: np.ndarray, tables: Optional[CompiledTables] = None) -> np.ndarray:
+        """Berekent emotionele scores voor een (..., kleuren) gewichtsmatrix als (..., emoties)."""
+        return (weights @ self.array_tables(tables)["score_matrix"]) / 100
+
+    def _build_keyword_matcher(self) -> KeywordMatcher:
+        """Bouwt de trefwoord-automaat uit de keywords van de agents."""
+        return KeywordMatcher(
+            (keyword, color)
+            for color, agent in self.agent_config["agents"].items()
+            for keyword in agent.get("keywords", ())
+        )
+
+    def find_keywords(self, context: str) -> List[Tuple[int, str, str]]:
+        """Geeft alle gevonden trefwoorden terug als (positie, trefwoord, kleur)."""
+        return self.keyword_matcher.find_all(context.lower())
+
     def calculate_rainbow_vector(self, color_weights: Dict[str, float]) -> Tuple[str, Tuple[float, float, float, float]]:
         """Berekent de regenboogvector in zowel hex als CMYK."""
         total_weight = sum(color_weights.values())
@@ -142,50 +385,50 @@ class ColorEmotionInterpreter:
 
     def get_emotional_score(self, context: str, color_weights: Dict[str, float]) -> Dict[str, float]:
         """Berekent emotionele scores op basis van context en kleurgewichten."""
-        emotional_scores = {}
-        
-        # Bereken basis emotionele scores
-        for color, agent in self.agent_config["agents"].items():
-            base_weight = color_weights.get(color, 0.0)
-            
-            # Bereken sub-tint gewichten
-            for emotion in agent["emotion"]:
-                if emotion not in emotional_scores:
-                    emotional_scores[emotion] = 0.0
-                
-                # Verdeel het gewicht over de sub-tints
-                for tint_type in ['light', 'medium', 'dark']:
-                    tint_weight = self.config['colors'][color]['sub_tints'][tint_type]['weight']
-                    emotional_scores[emotion] += (base_weight * tint_weight) / 100
+        # Zuiver Python: dezelfde termen als de rij-vector keer score_matrix
+        tables = self.tables
+        weights = [color_weights.get(color, 0.0) for color in tables.color_names]
+        return {
+            emotion: sum(weights[column] * tint_weight for column, tint_weight in terms) / 100
+            for emotion, terms in zip(tables.emotion_names, tables.score_terms)
+        }
 
-        return emotional_scores
+    def apply_lexicon(self, context: str, color_weights: Dict[str, float]) -> Dict[str, float]:
+        """Verhoogt color_weights met de lexicon woorden in de context.
+
+        Een lexicon gewicht van 1 telt als een volledig trefwoord; een kleur
+        houdt het hoogste van trefwoord en lexicon. Kleuren die niet in de
+        agent tabel staan worden genegeerd.
+        """
+        for color, weight in self.lexicon.color_weights(context).items():
+            if color in color_weights:
+                color_weights[color] = max(color_weights[color], KEYWORD_WEIGHT * weight)
+        return color_weights
 
     def analyze_context(self, context: str) -> Tuple[Dict[str, float], AgentDecision]:
         """Analyseert de context en geeft emotionele scores en beslissing terug."""
+        if self.cache is not None:
+            self.check_config()
+            key = normalize_key(context)
+            cached = self.cache.get(key)
+            if cached is not MISSING:
+                emotional_scores, decision = cached
+                return dict(emotional_scores), decision
+
         color_weights = {color: 0.0 for color in self.agent_config["agents"]}
         
-        # Voorbeeld: verhoog gewichten op basis van bepaalde woorden in de context
-        context_lower = context.lower()
-        
-        if "blij" in context_lower or "gelukkig" in context_lower:
-            color_weights["green"] = 30.0
-        if "kwaad" in context_lower or "woede" in context_lower:
-            color_weights["red"] = 30.0
-        if "verdriet" in context_lower or "gekwetst" in context_lower:
-            color_weights["blue"] = 30.0
-        if "jaloezie" in context_lower:
-            color_weights["purple"] = 30.0
-        if "schuld" in context_lower:
-            color_weights["pink"] = 30.0
-        if "ongeloof" in context_lower:
-            color_weights["yellow"] = 30.0
-        if "overweldigd" in context_lower:
-            color_weights["gray"] = 30.0
+        # Verhoog gewichten voor elke kleur waarvan een trefwoord in de context voorkomt
+        for color in self.keyword_matcher.matched_labels(context.lower()):
+            color_weights[color] = KEYWORD_WEIGHT
+        if self.lexicon is not None:
+            self.apply_lexicon(context, color_weights)
 
         emotional_scores = self.get_emotional_score(context, color_weights)
         rainbow_vector, cmyk_vector = self.calculate_rainbow_vector(color_weights)
         decision = self.determine_strategy(emotional_scores, cmyk_vector)
 
+        if self.cache is not None:
+            self.cache.put(key, (dict(emotional_scores), decision))
         return emotional_scores, decision
 
 # Voorbeeld gebruik
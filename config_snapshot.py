@@ -0,0 +1,240 @@
+import hashlib
+import json
+import marshal
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+# Volgorde van de sub-tints in gecompileerde tabellen
+TINT_TYPES = ('light', 'medium', 'dark')
+
+# Kop van het binaire cache bestand; marshal is per Python versie verschillend
+CACHE_MAGIC = b"RMCFG1" + bytes(sys.version_info[:2])
+
+
+class ConfigError(ValueError):
+    """color_config.json is missing, malformed or incomplete."""
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigSnapshot:
+    """Immutable, validated view of color_config.json.
+
+    ``colors`` mirrors the JSON structure with read-only mappings and
+    tuples. ``color_names``, ``tint_weights`` and ``base_cmyk`` are
+    precompiled lookups in config order. ``mtime_ns``, ``size`` and
+    ``sha256`` identify the file the snapshot was built from.
+    """
+    path: str
+    mtime_ns: int
+    size: int
+    sha256: str
+    colors: Mapping[str, Mapping[str, Any]]
+    color_names: Tuple[str, ...]
+    tint_weights: Mapping[str, Tuple[float, ...]]  # kleur -> gewicht per TINT_TYPES
+    base_cmyk: Mapping[str, Tuple[float, float, float, float]]
+
+    @property
+    def stamp(self) -> Tuple[int, int]:
+        return self.mtime_ns, self.size
+
+    @property
+    def config(self) -> Mapping[str, Any]:
+        """Read-only view in the shape of the parsed JSON file (``config["colors"][name]...``)."""
+        return MappingProxyType({"colors": self.colors})
+
+    def __reduce__(self):
+        # Read-only mappings zijn niet te picklen; bouw de snapshot opnieuw uit de config
+        return compile_snapshot, ({"colors": _thaw(self.colors)}, self.path, self.mtime_ns, self.size, self.sha256)
+
+
+def _freeze(value):
+    """Recursively turns dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Inverse of ``_freeze``: plain dicts and lists, as parsed from JSON."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _check_cmyk(value, where: str):
+    if (not isinstance(value, (list, tuple)) or len(value) != 4
+            or not all(isinstance(v, (int, float)) and 0.0 <= v <= 1.0 for v in value)):
+        raise ConfigError(f"{where}: cmyk must be four numbers between 0 and 1, got {value!r}")
+
+
+def _check_hex(value, where: str):
+    if not (isinstance(value, str) and len(value) == 7 and value[0] == "#"):
+        raise ConfigError(f"{where}: expected a #RRGGBB color, got {value!r}")
+    try:
+        int(value[1:], 16)
+    except ValueError:
+        raise ConfigError(f"{where}: expected a #RRGGBB color, got {value!r}")
+
+
+def validate_config(raw: Dict, path: str = "color_config.json"):
+    """Raises ConfigError when the parsed config does not have the expected structure."""
+    colors = raw.get("colors") if isinstance(raw, dict) else None
+    if not isinstance(colors, dict) or not colors:
+        raise ConfigError(f"{path}: expected a non-empty 'colors' object")
+    for name, color in colors.items():
+        where = f"{path}: colors.{name}"
+        if not isinstance(color, dict):
+            raise ConfigError(f"{where}: expected an object")
+        _check_hex(color.get("base"), f"{where}.base")
+        _check_cmyk(color.get("cmyk"), f"{where}.cmyk")
+        sub_tints = color.get("sub_tints")
+        if not isinstance(sub_tints, dict):
+            raise ConfigError(f"{where}: expected a 'sub_tints' object")
+        for tint in TINT_TYPES:
+            if tint not in sub_tints:
+                raise ConfigError(f"{where}.sub_tints: missing tint {tint!r}")
+        for tint, data in sub_tints.items():
+            tint_where = f"{where}.sub_tints.{tint}"
+            if not isinstance(data, dict):
+                raise ConfigError(f"{tint_where}: expected an object")
+            _check_hex(data.get("hex"), f"{tint_where}.hex")
+            _check_cmyk(data.get("cmyk"), f"{tint_where}.cmyk")
+            weight = data.get("weight")
+            if not isinstance(weight, (int, float)) or weight < 0:
+                raise ConfigError(f"{tint_where}: weight must be a non-negative number, got {weight!r}")
+
+
+def compile_snapshot(raw: Dict, path: str, mtime_ns: int, size: int, sha256: str) -> ConfigSnapshot:
+    """Builds the immutable snapshot from an already validated config."""
+    colors = raw["colors"]
+    return ConfigSnapshot(
+        path=path,
+        mtime_ns=mtime_ns,
+        size=size,
+        sha256=sha256,
+        colors=_freeze(colors),
+        color_names=tuple(colors),
+        tint_weights=MappingProxyType({
+            name: tuple(float(color["sub_tints"][tint]["weight"]) for tint in TINT_TYPES)
+            for name, color in colors.items()
+        }),
+        base_cmyk=MappingProxyType({name: tuple(color["cmyk"]) for name, color in colors.items()}),
+    )
+
+
+def default_cache_path(path: str) -> str:
+    return path + ".cache"
+
+
+def _read_cache(cache_path: str) -> Optional[Dict]:
+    try:
+        with open(cache_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if not data.startswith(CACHE_MAGIC):
+        return None
+    try:
+        entry = marshal.loads(data[len(CACHE_MAGIC):])
+    except (EOFError, ValueError, TypeError):
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def _write_cache(cache_path: str, entry: Dict):
+    """Writes the cache atomically; a read-only location only costs the speedup."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(CACHE_MAGIC + marshal.dumps(entry))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _load_snapshot(path: str, stat: os.stat_result, cache_path: Optional[str]) -> ConfigSnapshot:
+    """Loads the snapshot from the binary cache when it matches the file, else from JSON."""
+    cached = _read_cache(cache_path) if cache_path else None
+    if cached is not None and (cached.get("mtime_ns"), cached.get("size")) == (stat.st_mtime_ns, stat.st_size):
+        # Zelfde mtime en grootte: de cache is al gevalideerd
+        return compile_snapshot(cached["config"], path, stat.st_mtime_ns, stat.st_size, cached["sha256"])
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as error:
+        raise ConfigError(f"{path}: {error.strerror or error}") from error
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    if cached is not None and cached.get("sha256") == sha256:
+        # Alleen de mtime is veranderd (touch, checkout): inhoud hoeft niet opnieuw geparsed te worden
+        raw = cached["config"]
+    else:
+        try:
+            raw = json.loads(data)
+        except ValueError as error:
+            raise ConfigError(f"{path}: invalid JSON ({error})") from error
+        validate_config(raw, path)
+
+    if cache_path:
+        _write_cache(cache_path, {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                                  "sha256": sha256, "config": raw})
+    return compile_snapshot(raw, path, stat.st_mtime_ns, stat.st_size, sha256)
+
+
+# Eén snapshot per config bestand per proces
+_snapshots: Dict[str, ConfigSnapshot] = {}
+_lock = threading.Lock()
+
+
+def load_config(path: str = "color_config.json", use_cache_file: bool = True) -> ConfigSnapshot:
+    """Returns the shared snapshot for path, reloading it only when the file changed.
+
+    Within a process every caller gets the same snapshot object until the
+    file's mtime or size changes. Across processes the binary cache file
+    (``<path>.cache``) lets new workers skip JSON parsing and validation.
+    """
+    key = os.path.abspath(path)
+    try:
+        stat = os.stat(key)
+    except OSError as error:
+        raise ConfigError(f"{path}: {error.strerror or error}") from error
+
+    snapshot = _snapshots.get(key)
+    if snapshot is not None and snapshot.stamp == (stat.st_mtime_ns, stat.st_size):
+        return snapshot
+    with _lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None or snapshot.stamp != (stat.st_mtime_ns, stat.st_size):
+            snapshot = _load_snapshot(key, stat, default_cache_path(key) if use_cache_file else None)
+            _snapshots[key] = snapshot
+    return snapshot
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate color_config.json and refresh its binary cache")
+    parser.add_argument("path", nargs="?", default="color_config.json")
+    args = parser.parse_args()
+    try:
+        snapshot = load_config(args.path)
+    except ConfigError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    print(f"{snapshot.path}: {len(snapshot.color_names)} colors, sha256 {snapshot.sha256[:12]}")
+
+
+if __name__ == "__main__":
+    main()
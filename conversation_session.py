@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple
+
+from colorinterpreter import KEYWORD_WEIGHT, AgentDecision, ColorEmotionInterpreter, Strategy
+
+
+@dataclass(frozen=True, slots=True)
+class SessionState:
+    """Serializable state of a ConversationSession.
+
+    ``evidence`` holds the decayed keyword and lexicon hits per color; ``to_dict`` and
+    ``from_dict`` round-trip through JSON.
+    """
+    decay: float
+    message_count: int
+    evidence: Mapping[str, float]
+
+    def to_dict(self) -> Dict:
+        return {"decay": self.decay, "message_count": self.message_count, "evidence": dict(self.evidence)}
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "SessionState":
+        return cls(decay=float(data["decay"]), message_count=int(data["message_count"]),
+                   evidence={color: float(value) for color, value in data["evidence"].items()})
+
+
+class ConversationSession:
+    """Running color weights and emotional scores over a conversation.
+
+    Instead of re-analyzing the concatenated conversation for every new
+    message, the session keeps one evidence value per color. Each message
+    is scanned once and updates the evidence as
+
+        evidence = decay * evidence + (1 if a keyword of the color occurs else 0)
+
+    and a color's weight is ``KEYWORD_WEIGHT * min(1, evidence)``. With an
+    interpreter lexicon the increment is the highest of the keyword hit and
+    the lexicon weights of the message's words, as in ``analyze_context``.
+    With the default ``decay=1.0`` a color keeps its full weight once
+    mentioned, which is what ``analyze_context`` gives for the whole
+    conversation (lexicon weights below 1 add up over messages instead);
+    with ``decay < 1`` a mention fades by that factor per later message.
+    Adding a message costs O(message length); scores, rainbow vector and
+    strategy are recomputed from the per-color weights only.
+    """
+
+    def __init__(self, interpreter: Optional[ColorEmotionInterpreter] = None, decay: float = 1.0,
+                 config_path: str = "color_config.json"):
+        if not 0.0 <= decay <= 1.0:
+            raise ValueError(f"decay must be between 0 and 1, got {decay}")
+        self.interpreter = interpreter or ColorEmotionInterpreter(config_path)
+        self.decay = decay
+        self.reset()
+
+    def reset(self):
+        """Forgets all messages."""
+        self.message_count = 0
+        self._evidence = [0.0] * len(self.interpreter.color_names)
+        self._analysis: Optional[Tuple[Dict[str, float], AgentDecision]] = None
+
+    def __len__(self) -> int:
+        return self.message_count
+
+    def add_message(self, text: str) -> Tuple[Dict[str, float], AgentDecision]:
+        """Adds one message and returns the updated ``(emotional_scores, decision)``."""
+        matched = self.interpreter.keyword_matcher.matched_labels(text.lower())
+        color_index = self.interpreter.color_index
+        evidence = self._evidence
+        if self.decay != 1.0:
+            for i in range(len(evidence)):
+                evidence[i] *= self.decay
+        hits = dict.fromkeys(matched, 1.0)
+        lexicon = self.interpreter.lexicon
+        if lexicon is not None:
+            for color, weight in lexicon.color_weights(text).items():
+                if color in color_index and weight > hits.get(color, 0.0):
+                    hits[color] = weight
+        for color, hit in hits.items():
+            evidence[color_index[color]] += hit
+        self.message_count += 1
+        self._analysis = None
+        return self.analysis()
+
+    @property
+    def color_weights(self) -> Dict[str, float]:
+        return {color: KEYWORD_WEIGHT * min(1.0, value)
+                for color, value in zip(self.interpreter.color_names, self._evidence)}
+
+    def analysis(self) -> Tuple[Dict[str, float], AgentDecision]:
+        """Current ``(emotional_scores, decision)``, in the form returned by ``analyze_context``.
+
+        Can be passed on as ``AgentWhite.calculate_balanced_response(text, analysis=...)``.
+        """
+        if self._analysis is None:
+            interpreter = self.interpreter
+            color_weights = self.color_weights
+            emotional_scores = interpreter.get_emotional_score("", color_weights)
+            _, cmyk_vector = interpreter.calculate_rainbow_vector(color_weights)
+            self._analysis = emotional_scores, interpreter.determine_strategy(emotional_scores, cmyk_vector)
+        emotional_scores, decision = self._analysis
+        return dict(emotional_scores), decision
+
+    @property
+    def emotional_scores(self) -> Dict[str, float]:
+        return self.analysis()[0]
+
+    @property
+    def decision(self) -> AgentDecision:
+        return self.analysis()[1]
+
+    @property
+    def rainbow_vector(self) -> str:
+        return self.decision.rainbow_vector
+
+    @property
+    def strategy(self) -> Strategy:
+        return self.decision.strategy
+
+    def snapshot(self) -> SessionState:
+        """Returns the session state; it does not change when more messages are added."""
+        return SessionState(decay=self.decay, message_count=self.message_count,
+                            evidence=dict(zip(self.interpreter.color_names, self._evidence)))
+
+    def restore(self, state: SessionState):
+        """Continues from a snapshot; colors the interpreter does not know are ignored."""
+        if not 0.0 <= state.decay <= 1.0:
+            raise ValueError(f"decay must be between 0 and 1, got {state.decay}")
+        self.decay = state.decay
+        self.message_count = state.message_count
+        self._evidence = [float(state.evidence.get(color, 0.0)) for color in self.interpreter.color_names]
+        self._analysis = None
+
+    @classmethod
+    def from_state(cls, state: SessionState,
+                   interpreter: Optional[ColorEmotionInterpreter] = None) -> "ConversationSession":
+        session = cls(interpreter, state.decay)
+        session.restore(state)
+        return session
+
+
+# Voorbeeld gebruik
+if __name__ == "__main__":
+    session = ConversationSession(decay=0.7)
+    for message in [
+        "Ik ben zo blij met het nieuwe huis!",
+        "Maar mijn buurman is kwaad over de parkeerplaats.",
+        "Dat maakt me eigenlijk wel verdriet.",
+        "Hoe dan ook, het weer is mooi.",
+    ]:
+        session.add_message(message)
+        print(f"{message}\n  {session.rainbow_vector}  {session.strategy.value}  "
+              f"{ {color: round(weight, 1) for color, weight in session.color_weights.items() if weight} }")
+    state = session.snapshot().to_dict()
+    print(f"Snapshot: {state}")
+    restored = ConversationSession.from_state(SessionState.from_dict(state), session.interpreter)
+    print(f"Hersteld: {restored.rainbow_vector}  {restored.strategy.value}")
@@ -0,0 +1,270 @@
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+import numpy as np
+
+from agent_white import AgentWhite
+
+# Agent per worker proces (gezet door _init_worker)
+_worker_agent: Optional[AgentWhite] = None
+
+# Bestandsnaam van een npz shard, genummerd per chunk
+SHARD_PATTERN = re.compile(r"part-(\d{6})\.npz")
+
+
+class CorpusError(ValueError):
+    """The input corpus or the output of an earlier run cannot be used."""
+
+
+def detect_format(path: str) -> str:
+    """Derives the input format from the file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".csv":
+        return "csv"
+    return "text"
+
+
+def read_texts(stream: TextIO, input_format: str, field: str = "text") -> Iterator[str]:
+    """Yields texts one by one from a JSONL, CSV or plain-text stream.
+
+    Raises CorpusError naming the line when a record has no ``field`` or
+    its value is not a string.
+    """
+    if input_format == "jsonl":
+        for line_number, line in enumerate(stream, 1):
+            if line.strip():
+                record = json.loads(line)
+                if not isinstance(record, dict) or field not in record:
+                    raise CorpusError(f"line {line_number}: record has no field {field!r}")
+                text = record[field]
+                if not isinstance(text, str):
+                    raise CorpusError(f"line {line_number}: field {field!r} is {type(text).__name__}, not a string")
+                yield text
+    elif input_format == "csv":
+        reader = csv.DictReader(stream)
+        if reader.fieldnames is not None and field not in reader.fieldnames:
+            raise CorpusError(f"line 1: CSV header has no column {field!r}")
+        for row in reader:
+            if row.get(field) is None:
+                raise CorpusError(f"line {reader.line_num}: row has no value for column {field!r}")
+            yield row[field]
+    else:
+        for line in stream:
+            yield line.rstrip("\r\n")
+
+
+def chunked(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Groups an iterator into lists of at most size items."""
+    iterator = iter(texts)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _init_worker():
+    """Bouwt één AgentWhite per worker proces."""
+    global _worker_agent
+    _worker_agent = AgentWhite()
+
+
+def analyze_chunk(texts: List[str], output_format: str):
+    """Analyzes one chunk and returns it serialized for the output format."""
+    agent = _worker_agent
+    batch = agent.calculate_balanced_responses(texts)
+    if output_format == "jsonl":
+        return "".join(
+            json.dumps(result, ensure_ascii=False) + "\n"
+            for result in batch.to_dicts(agent.interpreter)
+        )
+    # Teksten als UTF-8 bytes plus offsets: een vaste-breedte array zou elke
+    # tekst opvullen tot de langste in de chunk
+    encoded = [text.encode("utf-8") for text in batch.contexts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(text) for text in encoded], out=offsets[1:])
+    return {
+        "context_offsets": offsets,
+        "context_utf8": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "rainbow_vector": np.array(batch.rainbow_vectors),
+        "strategy": batch.strategies,
+        "fallback": batch.fallback,
+        "cmyk_vector": batch.cmyk_vectors,
+        "emotional_scores": batch.emotional_scores,
+        "confidences": batch.confidences,
+        "dominant_emotions": batch.dominant_emotions,
+        "dominant_scores": batch.dominant_scores,
+        "color_names": np.array(batch.color_names),
+        "emotion_names": np.array(batch.emotion_names),
+    }
+
+
+def shard_contexts(shard) -> List[str]:
+    """The input texts of a loaded npz shard, in record order."""
+    offsets, data = shard["context_offsets"], shard["context_utf8"]
+    return [data[start:end].tobytes().decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+class CorpusWriter:
+    """Writes analyzed chunks incrementally and records a resumable offset.
+
+    JSONL output goes to one file; columnar output is a directory with one
+    ``part-NNNNNN.npz`` shard per chunk, holding the texts as UTF-8 bytes
+    plus offsets (see ``shard_contexts``). After each chunk the number of
+    input records done (and the JSONL byte size) is written atomically to
+    ``<output>.offset``, so an interrupted run can resume without
+    duplicating or losing records. Shards past the recorded chunk count,
+    from an earlier or interrupted run, are removed.
+    """
+
+    def __init__(self, output: str, output_format: str, resume: bool = False):
+        self.output = output
+        self.output_format = output_format
+        self.offset_path = output + ".offset"
+        self.state = {"records": 0, "chunks": 0, "bytes": 0}
+        if resume and os.path.exists(self.offset_path):
+            with open(self.offset_path) as f:
+                self.state = json.load(f)
+        elif not resume and os.path.exists(self.offset_path):
+            # Een nieuwe run: de offset van een eerdere run geldt niet meer
+            os.remove(self.offset_path)
+
+        if output_format == "jsonl":
+            size = os.path.getsize(output) if resume and os.path.exists(output) else 0
+            if size < self.state["bytes"]:
+                raise CorpusError(f"{output} has {size} bytes but {self.offset_path} records "
+                                  f"{self.state['bytes']}; cannot resume, run again without --resume")
+            mode = "r+b" if resume and os.path.exists(output) else "wb"
+            self._file = open(output, mode)
+            # Alles na de laatst vastgelegde offset is een half geschreven chunk
+            self._file.truncate(self.state["bytes"])
+            self._file.seek(self.state["bytes"])
+        else:
+            os.makedirs(output, exist_ok=True)
+            self._file = None
+            # Shards vanaf de vastgelegde chunk horen bij een eerdere of afgebroken run
+            for name in os.listdir(output):
+                match = SHARD_PATTERN.fullmatch(name)
+                if match and int(match.group(1)) >= self.state["chunks"]:
+                    os.remove(os.path.join(output, name))
+
+    @property
+    def records_done(self) -> int:
+        return self.state["records"]
+
+    def write(self, result, count: int):
+        if self._file is not None:
+            self._file.write(result.encode("utf-8"))
+            self._file.flush()
+            self.state["bytes"] = self._file.tell()
+        else:
+            np.savez(os.path.join(self.output, f"part-{self.state['chunks']:06d}.npz"), **result)
+        self.state["records"] += count
+        self.state["chunks"] += 1
+        tmp_path = self.offset_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.offset_path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def run(texts: Iterable[str], writer: CorpusWriter, workers: int = 0, chunk_size: int = 1000,
+        max_in_flight: Optional[int] = None, progress: Optional[TextIO] = sys.stderr,
+        progress_interval: float = 5.0) -> int:
+    """Streams texts through the analyzer and writes results in input order.
+
+    At most ``max_in_flight`` chunks are queued or running at any time, so
+    memory stays bounded regardless of corpus size. Returns the number of
+    records processed in this run.
+    """
+    chunks = chunked(itertools.islice(texts, writer.records_done, None), chunk_size)
+    processed = 0
+    started = last_report = time.monotonic()
+
+    def report(force: bool = False):
+        nonlocal last_report
+        now = time.monotonic()
+        if progress is not None and (force or now - last_report >= progress_interval):
+            rate = processed / max(now - started, 1e-9)
+            progress.write(f"{writer.records_done} records ({processed} this run, {rate:.0f}/s)\n")
+            progress.flush()
+            last_report = now
+
+    if workers <= 0:
+        _init_worker()
+        for chunk in chunks:
+            writer.write(analyze_chunk(chunk, writer.output_format), len(chunk))
+            processed += len(chunk)
+            report()
+        report(force=True)
+        return processed
+
+    max_in_flight = max_in_flight or workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((pool.submit(analyze_chunk, chunk, writer.output_format), len(chunk)))
+            if len(pending) >= max_in_flight:
+                future, count = pending.popleft()
+                writer.write(future.result(), count)
+                processed += count
+                report()
+        while pending:
+            future, count = pending.popleft()
+            writer.write(future.result(), count)
+            processed += count
+            report()
+    report(force=True)
+    return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a text corpus in bounded memory")
+    parser.add_argument("input", help="Input file (.jsonl, .csv or plain text, one text per line) or - for stdin")
+    parser.add_argument("output", help="Output .jsonl file, or a directory for --output-format npz")
+    parser.add_argument("--input-format", choices=["jsonl", "csv", "text"], help="Defaults to the input extension")
+    parser.add_argument("--field", default="text", help="JSON field or CSV column holding the text")
+    parser.add_argument("--output-format", choices=["jsonl", "npz"], default="jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes; 0 runs inline")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--resume", action="store_true", help="Continue from the offset recorded by an earlier run")
+    parser.add_argument("--quiet", action="store_true", help="Do not report progress on stderr")
+    args = parser.parse_args()
+
+    input_format = args.input_format or ("text" if args.input == "-" else detect_format(args.input))
+    if args.input == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+    else:
+        stream = open(args.input, encoding="utf-8", newline="" if input_format == "csv" else None)
+
+    try:
+        writer = CorpusWriter(args.output, args.output_format, resume=args.resume)
+        try:
+            run(read_texts(stream, input_format, args.field), writer, workers=args.workers,
+                chunk_size=args.chunk_size, progress=None if args.quiet else sys.stderr)
+        finally:
+            writer.close()
+    except CorpusError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        stream.close()
+
+
+if __name__ == "__main__":
+    main()
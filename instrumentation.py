@@ -0,0 +1,273 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Bovengrenzen van de latency buckets in seconden (1 µs .. 1 s)
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 0.1, 1.0)
+
+HELP = {
+    "stage_seconds": "Latency per analysis stage",
+    "requests_total": "Analyses per entry point",
+    "cache_lookups_total": "Result cache lookups",
+    "decisions_total": "Strategy decisions",
+    "fallbacks_total": "Decisions with fallback (too much black)",
+}
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus model."""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # laatste bucket: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """``(upper bound, observations <= bound)`` pairs, ending with +Inf."""
+        total, result = 0, []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (0 without observations)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """Stage latency histograms and labelled counters.
+
+    ``snapshot()`` returns everything as plain dicts for the Python API;
+    ``to_prometheus()`` renders the Prometheus text exposition format.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, prefix: str = "remonsters"):
+        self.buckets = buckets
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Histogram] = {}
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> Dict:
+        """Current values: per stage count, sum, p50/p99 and buckets; counters by name and labels."""
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                    "p50": histogram.quantile(0.5),
+                    "p99": histogram.quantile(0.99),
+                    "buckets": histogram.cumulative(),
+                }
+                for stage, histogram in self.stages.items()
+            }
+            counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+            for (name, labels), value in self.counters.items():
+                counters.setdefault(name, {})[labels] = value
+        return {"stages": stages, "counters": counters}
+
+    def to_prometheus(self) -> str:
+        """Renders all metrics in the Prometheus text format (version 0.0.4)."""
+        snapshot = self.snapshot()
+        lines = []
+        name = f"{self.prefix}_stage_seconds"
+        lines += [f"# HELP {name} {HELP['stage_seconds']}", f"# TYPE {name} histogram"]
+        for stage, values in sorted(snapshot["stages"].items()):
+            for bound, total in values["buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {total}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {values["sum"]!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {values["count"]}')
+        for counter, series in sorted(snapshot["counters"].items()):
+            name = f"{self.prefix}_{counter}"
+            lines += [f"# HELP {name} {HELP.get(counter, counter)}", f"# TYPE {name} counter"]
+            for labels, value in sorted(series.items()):
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+                lines.append(f"{name}{{{label_text}}} {value:g}" if label_text else f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Globale metrics; alleen gevuld terwijl instrumentatie aan staat
+metrics = Metrics()
+
+# (klasse, attribuut) -> oorspronkelijke attribuut uit de klasse __dict__
+_originals: Dict[Tuple[type, str], object] = {}
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Times a block of custom code as a stage, when instrumentation is enabled."""
+    if not _originals:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(name, time.perf_counter() - start)
+
+
+def _count_decision(result):
+    _, decision = result
+    metrics.inc("decisions_total", strategy=decision.strategy.value)
+    if decision.fallback:
+        metrics.inc("fallbacks_total")
+
+
+def _count_batch(result):
+    from colorinterpreter import STRATEGIES
+
+    metrics.inc("requests_total", len(result), entry="calculate_balanced_responses")
+    if isinstance(result, list):  # expand=True
+        for response in result:
+            metrics.inc("decisions_total", strategy=response["strategy"])
+        return
+    codes = result.strategy_codes.tolist()
+    for code in set(codes):
+        metrics.inc("decisions_total", codes.count(code), strategy=STRATEGIES[code].value)
+    fallbacks = int(result.fallback.sum())
+    if fallbacks:
+        metrics.inc("fallbacks_total", fallbacks)
+
+
+def _count_cache(result):
+    from result_cache import MISSING
+
+    metrics.inc("cache_lookups_total", result="miss" if result is MISSING else "hit")
+
+
+def _instrumented_targets() -> List[Tuple[type, str, Optional[str], Optional[Callable]]]:
+    """(klasse, methode, stage naam of None, nabewerking van het resultaat) per hook."""
+    from agent_white import AgentWhite
+    from color_utils import ColorConverter
+    from colorinterpreter import ColorEmotionInterpreter
+    from keyword_matcher import KeywordMatcher
+    from result_cache import ResultCache
+
+    def request(entry):
+        return lambda result: metrics.inc("requests_total", entry=entry)
+
+    def analyzed(result):
+        metrics.inc("requests_total", entry="analyze_context")
+        _count_decision(result)
+
+    return [
+        (ColorEmotionInterpreter, "analyze_context", "analyze_context", analyzed),
+        (KeywordMatcher, "matched_labels", "keyword_match", None),
+        (ColorEmotionInterpreter, "get_emotional_score", "emotional_score", None),
+        (ColorEmotionInterpreter, "calculate_rainbow_vector", "rainbow_vector", None),
+        (ColorConverter, "blend_cmyk_colors", "blend_cmyk", None),
+        (ColorEmotionInterpreter, "determine_strategy", "determine_strategy", None),
+        (AgentWhite, "collect_agent_feedback", "agent_feedback", None),
+        (AgentWhite, "calculate_balanced_response", "balanced_response", request("calculate_balanced_response")),
+        (AgentWhite, "calculate_balanced_responses", "balanced_responses", _count_batch),
+        (ResultCache, "get", None, _count_cache),
+    ]
+
+
+def _wrap(function: Callable, stage_name: Optional[str], after: Optional[Callable]) -> Callable:
+    perf_counter = time.perf_counter
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        result = function(*args, **kwargs)
+        if stage_name is not None:
+            metrics.observe(stage_name, perf_counter() - start)
+        if after is not None:
+            after(result)
+        return result
+
+    return wrapper
+
+
+def enable():
+    """Installs the timing hooks around every analysis stage.
+
+    The hooks replace the methods on their classes, so they apply to all
+    instances in this process, and ``disable()`` restores the originals:
+    with instrumentation off the analysis code runs unchanged. Worker
+    processes (``ParallelEngine``, ``server.py --pool process``) keep
+    their own, unexported metrics.
+    """
+    if _originals:
+        return
+    for cls, name, stage_name, after in _instrumented_targets():
+        raw = cls.__dict__[name]
+        wrapped = _wrap(getattr(cls, name), stage_name, after)
+        _originals[(cls, name)] = raw
+        setattr(cls, name, staticmethod(wrapped) if isinstance(raw, staticmethod) else wrapped)
+
+
+def disable():
+    """Removes the hooks; recorded metrics are kept until ``metrics.reset()``."""
+    while _originals:
+        (cls, name), raw = _originals.popitem()
+        setattr(cls, name, raw)
+
+
+@contextmanager
+def instrumented() -> Iterator[Metrics]:
+    """Enables instrumentation for the duration of a block."""
+    enable()
+    try:
+        yield metrics
+    finally:
+        disable()
+
+
+# Voorbeeld gebruik
+if __name__ == "__main__":
+    from agent_white import AgentWhite
+
+    agent = AgentWhite(cache_size=100)
+    with instrumented():
+        for text in ["Ik ben erg blij!", "Ik ben kwaad en overweldigd.", "Ik ben erg blij!"] * 100:
+            agent.calculate_balanced_response(text)
+    print(metrics.to_prometheus())
+    for name, values in metrics.snapshot()["stages"].items():
+        print(f"{name:20s} n={values['count']:<5d} mean {values['mean'] * 1e6:7.1f} µs  p99 <= {values['p99'] * 1e6:g} µs")
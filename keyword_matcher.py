@@ -0,0 +1,163 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Tot dit aantal trefwoorden is één gecombineerde regex sneller dan de
+# automaat; daarboven groeit de regex lineair met het aantal alternatieven
+# (gemeten op de synthetische benchmark corpus: gelijk rond 60 trefwoorden)
+REGEX_MAX_KEYWORDS = 64
+
+
+class KeywordMatcher:
+    """Finds every keyword in a single pass over the text.
+
+    Keywords are matched as substrings (like ``keyword in text``), so
+    ``woede`` also matches inside ``woedend``. Overlapping matches are all
+    reported. Matching is case-sensitive; callers lowercase the text.
+
+    Up to ``REGEX_MAX_KEYWORDS`` keywords the scan is one compiled
+    lookahead regex ``(?=(kw1|kw2|...))``, longest keyword first, so each
+    start position yields the longest keyword there; the shorter keywords
+    at that position are its prefixes and are looked up per match. Larger
+    keyword sets use an Aho-Corasick automaton, whose cost does not grow
+    with the number of keywords.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, str]]):
+        # keywords: (keyword, label) paren, bv. ("blij", "green")
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[Tuple[str, str], ...]] = [()]
+        self.keywords: Dict[str, Tuple[str, ...]] = {}
+
+        for keyword, label in keywords:
+            if not keyword:
+                raise ValueError("Keywords must be non-empty strings")
+            labels = self.keywords.setdefault(keyword, ())
+            if label not in labels:
+                self.keywords[keyword] = labels + (label,)
+
+        for keyword, labels in self.keywords.items():
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(())
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._outputs[state] += tuple((keyword, label) for label in labels)
+
+        self._build_failure_links()
+        self._build_scanner()
+
+    def _build_scanner(self):
+        """Compiles the lookahead regex, or the root skip of the automaton for large keyword sets."""
+        self._pattern: Optional[re.Pattern] = None
+        self._root_skip: Optional[re.Pattern] = None
+        if len(self.keywords) > REGEX_MAX_KEYWORDS:
+            # Op de root springen we met een C-level regex naar de volgende positie
+            # waar een trefwoord kan beginnen (eerste en tweede teken moeten passen)
+            self._root_skip = self._build_root_skip()
+            return
+        if not self.keywords:
+            return
+        longest_first = sorted(self.keywords, key=len, reverse=True)
+        self._pattern = re.compile("(?=(" + "|".join(map(re.escape, longest_first)) + "))")
+        # Per langste trefwoord: alle (trefwoord, label) paren die op dezelfde positie beginnen
+        self._prefix_matches: Dict[str, Tuple[Tuple[str, str], ...]] = {
+            keyword: tuple((prefix, label) for prefix in longest_first if keyword.startswith(prefix)
+                           for label in self.keywords[prefix])
+            for keyword in self.keywords
+        }
+        self._prefix_labels: Dict[str, Set[str]] = {
+            keyword: {label for _, label in matches} for keyword, matches in self._prefix_matches.items()
+        }
+
+    def _build_failure_links(self):
+        """Breadth-first construction of failure links and merged outputs."""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state] += self._outputs[self._fail[next_state]]
+
+    def _build_root_skip(self):
+        """Compiles a regex that finds candidate keyword start positions."""
+        if not self.keywords:
+            return None
+        first_chars = "".join(sorted({keyword[0] for keyword in self.keywords}))
+        pattern = "[" + re.escape(first_chars) + "]"
+        if all(len(keyword) > 1 for keyword in self.keywords):
+            second_chars = "".join(sorted({keyword[1] for keyword in self.keywords}))
+            pattern += "(?=[" + re.escape(second_chars) + "])"
+        return re.compile(pattern)
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def _scan(self, text: str):
+        """Yields (end_index, outputs) for every position where at least one keyword ends."""
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        skip = self._root_skip
+        if skip is None:
+            return
+
+        state = 0
+        position = 0
+        length = len(text)
+        while position < length:
+            if state == 0:
+                found = skip.search(text, position)
+                if found is None:
+                    return
+                position = found.start()
+            char = text[position]
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                yield position, outputs[state]
+            position += 1
+
+    def find_all(self, text: str) -> List[Tuple[int, str, str]]:
+        """Returns every match as (start, keyword, label), ordered by end position."""
+        if self._pattern is None:
+            return [
+                (end - len(keyword) + 1, keyword, label)
+                for end, matches in self._scan(text)
+                for keyword, label in matches
+            ]
+        prefix_matches = self._prefix_matches
+        found = [
+            (match.start(), keyword, label)
+            for match in self._pattern.finditer(text)
+            for keyword, label in prefix_matches[match.group(1)]
+        ]
+        # Zelfde volgorde als de automaat: op eindpositie, bij gelijk einde het langste trefwoord eerst
+        found.sort(key=lambda item: (item[0] + len(item[1]), -len(item[1])))
+        return found
+
+    def matched_labels(self, text: str) -> Set[str]:
+        """Returns the set of labels with at least one keyword in the text."""
+        labels = set()
+        if self._pattern is None:
+            for _, matches in self._scan(text):
+                for _, label in matches:
+                    labels.add(label)
+            return labels
+        prefix_labels = self._prefix_labels
+        for keyword in self._pattern.findall(text):
+            labels |= prefix_labels[keyword]
+        return labels
@@ -0,0 +1,107 @@
+import argparse
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from color_utils import ArrayColorConverter, ColorConverter
+
+# Aantal 8-bit sRGB kleuren in de tabel
+LUT_SIZE = 256 ** 3
+
+# Schaal van het compacte int16 formaat: L* in 0..10000, a*/b* in -12800..12800
+QUANTIZED_SCALE = 100.0
+
+
+def rgb_index(rgb: np.ndarray) -> np.ndarray:
+    """Packs (..., 3) 8-bit RGB values into table indices."""
+    rgb = np.asarray(rgb).astype(np.int64, copy=False)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def build_lab_lut(path: str, quantized: bool = False, chunk_size: int = 1 << 20) -> str:
+    """Builds the full sRGB -> LAB table and saves it as a .npy file.
+
+    The table has one (L*, a*, b*) row per packed ``0xRRGGBB`` index, as
+    float32 or, with ``quantized=True``, as int16 scaled by
+    ``QUANTIZED_SCALE`` (half the size, 0.005 resolution). Rows are
+    written chunk by chunk into a memory-mapped file, so building needs
+    only ``chunk_size`` rows in memory.
+    """
+    dtype = np.int16 if quantized else np.float32
+    tmp_path = path + ".tmp"
+    table = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=(LUT_SIZE, 3))
+    for start in range(0, LUT_SIZE, chunk_size):
+        index = np.arange(start, min(start + chunk_size, LUT_SIZE), dtype=np.int64)
+        rgb = np.stack([(index >> 16) & 0xFF, (index >> 8) & 0xFF, index & 0xFF], axis=-1)
+        lab = ArrayColorConverter.xyz_to_lab(ArrayColorConverter.rgb_to_xyz(rgb))
+        if quantized:
+            lab = np.rint(lab * QUANTIZED_SCALE)
+        table[start:start + len(index)] = lab
+    table.flush()
+    del table
+    # Atomisch vervangen zodat lezers nooit een halve tabel zien
+    os.replace(tmp_path, path)
+    return path
+
+
+class LabLookupTable:
+    """Read-only, memory-mapped sRGB -> LAB table.
+
+    All processes that open the same file share its pages through the OS
+    page cache, so the table costs its size in RAM once per machine, not
+    once per worker. Values are within about 1e-5 of the computed
+    conversion for float32 tables and within 0.005 for quantized ones.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.table = np.load(path, mmap_mode="r")
+        if self.table.shape != (LUT_SIZE, 3):
+            raise ValueError(f"{path} is not a sRGB -> LAB table (shape {self.table.shape})")
+        self.quantized = self.table.dtype == np.int16
+        self.scale = 1.0 / QUANTIZED_SCALE if self.quantized else 1.0
+        # Platte memoryview voor snelle scalaire opzoekingen zonder NumPy overhead
+        self._flat = memoryview(np.asarray(self.table).reshape(-1))
+
+    @classmethod
+    def load_or_build(cls, path: str, quantized: bool = False) -> "LabLookupTable":
+        """Opens the table at path, building it first when the file does not exist."""
+        if not os.path.exists(path):
+            build_lab_lut(path, quantized=quantized)
+        return cls(path)
+
+    def rgb_to_lab(self, r: int, g: int, b: int) -> Tuple[float, float, float]:
+        """Looks up a single 8-bit RGB color."""
+        if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+            raise ValueError(f"RGB ({r}, {g}, {b}) is outside the 8-bit table")
+        offset = ((r << 16) | (g << 8) | b) * 3
+        flat = self._flat
+        if self.quantized:
+            scale = self.scale
+            return flat[offset] * scale, flat[offset + 1] * scale, flat[offset + 2] * scale
+        return flat[offset], flat[offset + 1], flat[offset + 2]
+
+    def rgb_to_lab_array(self, rgb: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Looks up (..., 3) 8-bit RGB values, e.g. a palette or an (H, W, 3) image."""
+        rgb = np.asarray(rgb)
+        if rgb.size and (rgb.min() < 0 or rgb.max() > 255):
+            raise ValueError("RGB values outside 0..255 are not in the 8-bit table")
+        lab = self.table[rgb_index(rgb)]
+        if out is None:
+            out = np.empty(lab.shape, dtype=np.float64)
+        np.multiply(lab, self.scale, out=out, casting="unsafe")
+        return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the sRGB -> LAB lookup table")
+    parser.add_argument("path", help="Output .npy file")
+    parser.add_argument("--quantized", action="store_true", help="Store int16 values instead of float32")
+    args = parser.parse_args()
+    build_lab_lut(args.path, quantized=args.quantized)
+    print(f"Wrote {args.path} ({os.path.getsize(args.path) / 2**20:.0f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import importlib
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    ``np = LazyModule("numpy")`` keeps the import out of module load time,
+    so code paths that never touch NumPy never pay for it. After the first
+    access the module's attributes are copied onto the proxy and later
+    lookups are plain attribute reads.
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_lazy_name"] = name
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self._lazy_name)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._lazy_name!r}>"
@@ -0,0 +1,364 @@
+import argparse
+import csv
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# Bestandsformaat (little-endian):
+#   header   MAGIC, aantal termen, aantal kleuren, tabelgrootte, offsets van de secties
+#   colors   kleurnamen, UTF-8, gescheiden door "\n"
+#   table    uint32[tabelgrootte]: term index + 1 (0 = leeg), open addressing op crc32
+#   entries  per term (uint32 offset, uint32 lengte) in strings
+#   weights  float32[termen x kleuren], 8-byte uitgelijnd
+#   strings  UTF-8 bytes van alle termen
+MAGIC = b"RMLEX001"
+_HEADER = struct.Struct("<8sIIII5Q")
+_ENTRY = struct.Struct("<II")
+
+# Woorden in een tekst; lexicon termen zijn losse woorden in kleine letters
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Aantal opgezochte termen dat per proces in een dict wordt bewaard
+LOOKUP_CACHE_SIZE = 16384
+
+
+class LexiconError(ValueError):
+    """A lexicon file or source is malformed."""
+
+
+def _align(offset: int, alignment: int = 8) -> int:
+    return -(-offset // alignment) * alignment
+
+
+def build_lexicon(entries: Mapping[str, Mapping[str, float]], path: str, colors: Optional[Sequence[str]] = None) -> int:
+    """Writes ``{term: {color: weight}}`` as a binary lexicon; returns the file size.
+
+    Terms are stored lowercased; weights must lie in 0-1, where 1 counts as
+    a full keyword hit. ``colors`` fixes the column order (defaults to the
+    order of first appearance).
+    """
+    terms: Dict[str, Dict[str, float]] = {}
+    for term, weights in entries.items():
+        key = term.strip().lower()
+        if not key or TOKEN_PATTERN.fullmatch(key) is None:
+            raise LexiconError(f"Lexicon terms must be single words, got {term!r}")
+        merged = terms.setdefault(key, {})
+        for color, weight in weights.items():
+            weight = float(weight)
+            if not 0.0 <= weight <= 1.0:
+                raise LexiconError(f"{term!r}: weight for {color!r} must be between 0 and 1, got {weight}")
+            merged[color] = max(merged.get(color, 0.0), weight)
+
+    if colors is None:
+        colors = list(dict.fromkeys(color for weights in terms.values() for color in weights))
+    column = {color: i for i, color in enumerate(colors)}
+    unknown = {color for weights in terms.values() for color in weights} - set(column)
+    if unknown:
+        raise LexiconError(f"Weights for colors outside the color list: {', '.join(sorted(unknown))}")
+
+    table_size = 1
+    while table_size < 2 * max(len(terms), 1):
+        table_size *= 2
+    table = [0] * table_size
+    strings = bytearray()
+    entry_records = bytearray()
+    weight_values: List[float] = []
+    for index, (term, weights) in enumerate(terms.items()):
+        encoded = term.encode("utf-8")
+        slot = zlib.crc32(encoded) & (table_size - 1)
+        while table[slot]:
+            slot = (slot + 1) & (table_size - 1)
+        table[slot] = index + 1
+        entry_records += _ENTRY.pack(len(strings), len(encoded))
+        strings += encoded
+        row = [0.0] * len(colors)
+        for color, weight in weights.items():
+            row[column[color]] = weight
+        weight_values += row
+
+    color_bytes = "\n".join(colors).encode("utf-8")
+    colors_offset = _HEADER.size
+    table_offset = _align(colors_offset + len(color_bytes))
+    entries_offset = table_offset + 4 * table_size
+    weights_offset = _align(entries_offset + len(entry_records))
+    strings_offset = weights_offset + 4 * len(weight_values)
+
+    header = _HEADER.pack(MAGIC, len(terms), len(colors), table_size, 0,
+                          colors_offset, table_offset, entries_offset, weights_offset, strings_offset)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(color_bytes)
+        f.write(b"\0" * (table_offset - colors_offset - len(color_bytes)))
+        f.write(struct.pack(f"<{table_size}I", *table))
+        f.write(entry_records)
+        f.write(b"\0" * (weights_offset - entries_offset - len(entry_records)))
+        f.write(struct.pack(f"<{len(weight_values)}f", *weight_values))
+        f.write(strings)
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+class Lexicon:
+    """Read-only view of a binary lexicon file.
+
+    The file is memory-mapped on first use, so constructing a Lexicon is
+    free and worker processes that map the same file share its pages
+    through the OS page cache instead of each holding a copy. Pickling a
+    Lexicon only transfers the path. Lookups hash the term with crc32 and
+    compare it against the stored bytes, reading the sections through
+    memoryviews on the mapping; recent results are kept in a small
+    per-process dict.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+        self._views: List[memoryview] = []
+        self._cache: Dict[str, Optional[Dict[str, float]]] = {}
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def _open(self) -> mmap.mmap:
+        if self._map is None:
+            if sys.byteorder != "little":
+                raise LexiconError("Lexicon files are little-endian; this host is not")
+            with open(self.path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(data) < _HEADER.size or data[:len(MAGIC)] != MAGIC:
+                data.close()
+                raise LexiconError(f"{self.path}: not a lexicon file")
+            (_, self._term_count, color_count, self._table_size, _, colors_offset, self._table_offset,
+             self._entries_offset, self._weights_offset, self._strings_offset) = _HEADER.unpack_from(data)
+            problem = self._check_layout(len(data), color_count, colors_offset)
+            if problem:
+                data.close()
+                raise LexiconError(f"{self.path}: {problem}; the file is truncated or corrupt")
+            self.colors: Tuple[str, ...] = tuple(
+                data[colors_offset:colors_offset + (self._table_offset - colors_offset)]
+                .rstrip(b"\0").decode("utf-8").split("\n")) if color_count else ()
+            # Zero-copy views op de secties van de mapping
+            view = memoryview(data)
+            self._table = view[self._table_offset:self._entries_offset].cast("I")
+            self._entries = view[self._entries_offset:self._entries_offset + 8 * self._term_count].cast("I")
+            self._weights = view[self._weights_offset:self._strings_offset].cast("f")
+            self._views = [self._table, self._entries, self._weights, view]
+            self._map = data
+            if len(self.colors) != color_count:
+                self.close()
+                raise LexiconError(f"{self.path}: header lists {color_count} colors, found {len(self.colors)}")
+            # Termen staan in volgorde in strings; de laatste moet in het bestand passen
+            if self._term_count and self._strings_offset + self._entries[-2] + self._entries[-1] > len(data):
+                self.close()
+                raise LexiconError(f"{self.path}: term strings are truncated")
+        return self._map
+
+    def _check_layout(self, size: int, color_count: int, colors_offset: int) -> Optional[str]:
+        """Describes the first header value that does not fit the file, or None."""
+        table_size = self._table_size
+        if table_size == 0 or table_size & (table_size - 1) or table_size < self._term_count:
+            return f"invalid hash table size {table_size}"
+        sections = [
+            ("colors", colors_offset, self._table_offset),
+            ("table", self._table_offset, self._table_offset + 4 * table_size),
+            ("entries", self._entries_offset, self._entries_offset + 8 * self._term_count),
+            ("weights", self._weights_offset, self._weights_offset + 4 * self._term_count * color_count),
+            ("strings", self._strings_offset, size),
+        ]
+        previous_end = _HEADER.size
+        for name, start, end in sections:
+            if start < previous_end or end < start or end > size:
+                return f"{name} section {start}-{end} does not fit in {size} bytes"
+            previous_end = end
+        return None
+
+    def close(self):
+        """Releases the mapping.
+
+        Arrays returned by ``weight_matrix`` still point into it; they keep
+        the mapping alive, and it is unmapped once the last one is dropped.
+        """
+        if self._map is not None:
+            # De mapping kan pas dicht als er geen views meer naar verwijzen
+            for view in self._views:
+                view.release()
+            self._views = []
+            try:
+                self._map.close()
+            except BufferError:
+                # Nog in gebruik door weight_matrix() arrays; sluit bij het vrijgeven daarvan
+                pass
+            self._map = None
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        self._open()
+        return self._term_count
+
+    def _find(self, key: bytes) -> int:
+        """Index of the term or -1."""
+        data = self._open()
+        table, entries, strings_offset = self._table, self._entries, self._strings_offset
+        mask = self._table_size - 1
+        slot = zlib.crc32(key) & mask
+        while True:
+            entry = table[slot]
+            if not entry:
+                return -1
+            start = strings_offset + entries[2 * entry - 2]
+            if entries[2 * entry - 1] == len(key) and data[start:start + len(key)] == key:
+                return entry - 1
+            slot = (slot + 1) & mask
+
+    def lookup(self, term: str) -> Optional[Dict[str, float]]:
+        """Non-zero color weights of a lowercase term, or None when it is not in the lexicon."""
+        cache = self._cache
+        if term in cache:
+            return cache[term]
+        try:
+            index = self._find(term.encode("utf-8"))
+        except IndexError:
+            raise LexiconError(f"{self.path}: hash table points outside the term entries; the file is corrupt") from None
+        if index < 0:
+            weights = None
+        else:
+            count = len(self.colors)
+            row = self._weights[index * count:(index + 1) * count].tolist()
+            weights = {color: weight for color, weight in zip(self.colors, row) if weight}
+        if len(cache) >= LOOKUP_CACHE_SIZE:
+            cache.clear()
+        cache[term] = weights
+        return weights
+
+    def __contains__(self, term: str) -> bool:
+        return self.lookup(term.lower()) is not None
+
+    def color_weights(self, text: str) -> Dict[str, float]:
+        """Per color the highest weight of any lexicon word in text."""
+        weights: Dict[str, float] = {}
+        for token in set(TOKEN_PATTERN.findall(text.lower())):
+            found = self.lookup(token)
+            if found:
+                for color, weight in found.items():
+                    if weight > weights.get(color, 0.0):
+                        weights[color] = weight
+        return weights
+
+    def terms(self) -> Iterable[str]:
+        data = self._open()
+        entries = self._entries
+        for index in range(self._term_count):
+            offset, length = entries[2 * index], entries[2 * index + 1]
+            start = self._strings_offset + offset
+            yield data[start:start + length].decode("utf-8")
+
+    def weight_matrix(self):
+        """(terms, colors) float32 NumPy view on the mapped file, without copying.
+
+        The view keeps the mapping alive after ``close``, until it is dropped.
+        """
+        import numpy as np
+
+        data = self._open()
+        return np.frombuffer(data, dtype="<f4", count=self._term_count * len(self.colors),
+                             offset=self._weights_offset).reshape(self._term_count, len(self.colors))
+
+
+def read_source(path: str) -> Dict[str, Dict[str, float]]:
+    """Reads a lexicon source file into ``{term: {color: weight}}``.
+
+    CSV files are either long (``term,color,weight`` per row) or wide (a
+    ``term`` column plus one column per color). JSON files hold either
+    ``{"term": {"color": weight}}`` or a list of ``{"term", "color",
+    "weight"}`` records.
+    """
+    entries: Dict[str, Dict[str, float]] = {}
+
+    def add(term, color, weight):
+        if weight in ("", None):
+            return
+        entries.setdefault(term, {})[color] = max(entries.get(term, {}).get(color, 0.0), float(weight))
+
+    try:
+        if path.lower().endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                for term, weights in data.items():
+                    for color, weight in weights.items():
+                        add(term, color, weight)
+            else:
+                for record in data:
+                    add(record["term"], record["color"], record["weight"])
+        else:
+            with open(path, encoding="utf-8", newline="") as f:
+                reader = csv.DictReader(f)
+                fields = reader.fieldnames or []
+                if "term" not in fields:
+                    raise LexiconError(f"{path}: expected a 'term' column")
+                long_format = "color" in fields and "weight" in fields
+                for row in reader:
+                    if long_format:
+                        add(row["term"], row["color"], row["weight"])
+                    else:
+                        for color in fields:
+                            if color != "term":
+                                add(row["term"], color, row[color])
+    except (KeyError, TypeError, ValueError, AttributeError) as error:
+        if isinstance(error, LexiconError):
+            raise
+        raise LexiconError(f"{path}: {error!r}") from error
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and inspect binary emotion lexicons")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Compile a CSV/JSON lexicon into the binary format")
+    build.add_argument("source", help="Lexicon source (.csv or .json)")
+    build.add_argument("output", help="Binary lexicon to write")
+    build.add_argument("--with-keywords", action="store_true",
+                       help="Also include the interpreter's built-in keywords with weight 1")
+    build.add_argument("--any-colors", action="store_true",
+                       help="Allow colors that are not in the interpreter's agent table")
+    lookup = commands.add_parser("lookup", help="Look terms up in a binary lexicon")
+    lookup.add_argument("lexicon")
+    lookup.add_argument("terms", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "lookup":
+        lexicon = Lexicon(args.lexicon)
+        print(f"{args.lexicon}: {len(lexicon)} terms, colors {', '.join(lexicon.colors)}")
+        for term in args.terms:
+            print(f"  {term}: {lexicon.lookup(term.lower())}")
+        return
+
+    from colorinterpreter import ColorEmotionInterpreter
+
+    interpreter = ColorEmotionInterpreter()
+    try:
+        entries = read_source(args.source)
+        if args.with_keywords:
+            for keyword, labels in interpreter.keyword_matcher.keywords.items():
+                for color in labels:
+                    entries.setdefault(keyword, {})[color] = 1.0
+        colors = None if args.any_colors else interpreter.color_names
+        size = build_lexicon(entries, args.output, colors)
+    except (LexiconError, OSError) as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    print(f"{args.output}: {len(Lexicon(args.output))} terms, {size / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from color_utils import ArrayColorConverter, ColorConverter
+from colorinterpreter import ColorEmotionInterpreter
+
+
+@dataclass(frozen=True, slots=True)
+class PaletteEntry:
+    """One indexed palette color: a config base color, a sub-tint or an agent color."""
+    color: str   # kleurnaam, bv. "green"
+    tint: str    # "base", "light", "medium", "dark" of "agent"
+    hex: str
+    lab: Tuple[float, float, float]
+
+
+class PaletteIndex:
+    """KD-tree over every palette color in CIELAB, for nearest-color lookups.
+
+    The index holds the base color and sub-tints of each color in
+    color_config.json plus the agent colors of the interpreter's agent
+    table. Distances are CIE76 ΔE (Euclidean distance in LAB), which is
+    what the tree searches on. The tree is rebuilt automatically when the
+    interpreter picks up a changed config file.
+    """
+
+    def __init__(self, interpreter: Optional[ColorEmotionInterpreter] = None,
+                 config_path: str = "color_config.json"):
+        self.interpreter = interpreter or ColorEmotionInterpreter(config_path)
+        self.entries: List[PaletteEntry] = []
+        self._snapshot = None
+        self.rebuild()
+
+    def rebuild(self):
+        """Collects the palette from the current config snapshot and rebuilds the tree."""
+        from scipy.spatial import cKDTree
+
+        snapshot = self.interpreter.snapshot
+        colors = []
+        for name, color in snapshot.colors.items():
+            colors.append((name, "base", color["base"]))
+            colors += [(name, tint, data["hex"]) for tint, data in color["sub_tints"].items()]
+        colors += [(name, "agent", agent["color"]) for name, agent in self.interpreter.agent_config["agents"].items()]
+
+        lab = ArrayColorConverter.rgb_to_lab(ArrayColorConverter.hex_to_rgb([hex_color for _, _, hex_color in colors]))
+        self.entries = [
+            PaletteEntry(color=name, tint=tint, hex=hex_color.lower(), lab=tuple(values))
+            for (name, tint, hex_color), values in zip(colors, lab.tolist())
+        ]
+        self.lab = lab
+        self.tree = cKDTree(lab)
+        self._snapshot = snapshot
+
+    def _check_current(self):
+        """Rebuilds the tree when the interpreter reloaded its config."""
+        self.interpreter.check_config()
+        if self.interpreter.snapshot is not self._snapshot:
+            self.rebuild()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def query_lab(self, lab: np.ndarray, k: int = 1, workers: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Finds the k nearest palette entries for (..., 3) LAB values.
+
+        Returns ``(distances, indices)``, both of shape ``(..., k)``,
+        sorted from nearest to farthest; indices point into ``entries``.
+        ``workers=-1`` spreads large queries over all CPUs.
+        """
+        self._check_current()
+        lab = np.asarray(lab, dtype=np.float64)
+        k = min(k, len(self.entries))
+        distances, indices = self.tree.query(lab.reshape(-1, 3), k=k, workers=workers)
+        shape = lab.shape[:-1] + (k,)
+        return distances.reshape(shape), indices.reshape(shape)
+
+    def query_hex(self, hex_colors: Sequence[str], k: int = 1, workers: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Like ``query_lab`` for a sequence of hex colors; results have shape (N, k)."""
+        return self.query_lab(ArrayColorConverter.rgb_to_lab(ArrayColorConverter.hex_to_rgb(hex_colors)), k, workers)
+
+    def nearest(self, color: Union[str, Sequence[float]], k: int = 1) -> List[Tuple[PaletteEntry, float]]:
+        """Returns the k nearest entries with their ΔE for one hex color or LAB triple."""
+        if isinstance(color, str):
+            hex_color = color.lstrip('#')
+            color = ColorConverter.rgb_to_lab(int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16))
+        distances, indices = self.query_lab(np.asarray(color, dtype=np.float64), k)
+        return [(self.entries[index], distance) for distance, index in zip(distances.tolist(), indices.tolist())]
+
+
+# Voorbeeld gebruik
+if __name__ == "__main__":
+    index = PaletteIndex()
+    for hex_color in ["#ff0000", "#22cc44", "#7f7f7f", "#3a1f5c"]:
+        print(hex_color)
+        for entry, delta_e in index.nearest(hex_color, k=3):
+            print(f"  {entry.color:7s} {entry.tint:7s} {entry.hex}  ΔE {delta_e:.2f}")
@@ -0,0 +1,210 @@
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from agent_white import AgentWhite, BalancedResponseBatch
+from colorinterpreter import ColorEmotionInterpreter
+from corpus_analyzer import chunked
+from keyword_matcher import KeywordMatcher
+
+# Numerieke interpreter tabellen die in gedeeld geheugen komen
+NUMERIC_TABLES = ("tint_weights", "score_matrix", "agent_cmyk")
+
+# Uitlijning van elke array in het gedeelde blok
+_ALIGNMENT = 64
+
+# Per worker proces (gezet door _init_worker)
+_worker_agent: Optional[AgentWhite] = None
+_worker_tables: Optional["SharedTables"] = None
+
+
+class SharedTables:
+    """The numeric interpreter tables in one shared memory block.
+
+    Holds the agent CMYK matrix, tint weights and score matrix. The parent
+    creates the block once; workers attach to it by name through ``spec``
+    and read the arrays in place, so no table is pickled per task. ``meta``
+    carries what a worker needs to rebuild the parent's agent without
+    reading any file: the config snapshot, the agent config of the
+    registry and the (keyword, color) pairs, from which each worker
+    compiles its own small keyword matcher. A lexicon is passed by path;
+    every worker memory-maps the same file.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, layout: Dict[str, Tuple[int, Tuple[int, ...], str]],
+                 meta: Dict, owner: bool):
+        self.shm = shm
+        self.layout = layout   # naam -> (offset, shape, dtype)
+        self.meta = meta       # color_names, emotion_names, keyword_pairs, lexicon, snapshot, agent_config
+        self.owner = owner
+        self.arrays = {
+            name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for name, (offset, shape, dtype) in layout.items()
+        }
+
+    @classmethod
+    def create(cls, agent: AgentWhite) -> "SharedTables":
+        """Copies the tables of the agent's interpreter into a new shared memory block."""
+        interpreter = agent.interpreter
+        arrays = {name: getattr(interpreter, name) for name in NUMERIC_TABLES}
+
+        layout, size = {}, 0
+        for name, array in arrays.items():
+            layout[name] = (size, array.shape, array.dtype.str)
+            size += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        meta = {"color_names": list(interpreter.color_names), "emotion_names": list(interpreter.emotion_names),
+                "keyword_pairs": [(keyword, label) for keyword, labels in interpreter.keyword_matcher.keywords.items()
+                                  for label in labels],
+                "lexicon": interpreter.lexicon.path if interpreter.lexicon is not None else None,
+                "snapshot": interpreter.snapshot,
+                "agent_config": agent.agent_config}
+        tables = cls(shm, layout, meta, owner=True)
+        for name, array in arrays.items():
+            tables.arrays[name][...] = array
+        return tables
+
+    @classmethod
+    def attach(cls, name: str, layout: Dict, meta: Dict) -> "SharedTables":
+        return cls(shared_memory.SharedMemory(name=name), layout, meta, owner=False)
+
+    @property
+    def spec(self) -> Tuple[str, Dict, Dict]:
+        """Arguments for ``attach`` in another process."""
+        return self.shm.name, self.layout, self.meta
+
+    def build_agent(self) -> AgentWhite:
+        """Rebuilds the parent's agent on top of the shared tables, without reading the config file."""
+        meta = self.meta
+        snapshot = meta["snapshot"]
+        interpreter = ColorEmotionInterpreter(snapshot.path, snapshot=snapshot, lexicon=meta["lexicon"])
+        interpreter.attach_tables(self.arrays, KeywordMatcher(meta["keyword_pairs"]),
+                                  meta["color_names"], meta["emotion_names"])
+        return AgentWhite(agent_config=meta["agent_config"], interpreter=interpreter)
+
+    def close(self):
+        """Releases this process's mapping; the owner also removes the block."""
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _init_worker(spec: Tuple[str, Dict, Dict]):
+    """Builds one AgentWhite per worker process on top of the shared tables."""
+    global _worker_agent, _worker_tables
+    _worker_tables = SharedTables.attach(*spec)
+    _worker_agent = _worker_tables.build_agent()
+
+
+def _analyze_chunk(texts: List[str]) -> BalancedResponseBatch:
+    batch = _worker_agent.calculate_balanced_responses(texts)
+    # De ouder heeft de teksten nog; niet terugsturen
+    batch.contexts = []
+    return batch
+
+
+class ParallelEngine:
+    """Analyzes texts with ``calculate_balanced_responses`` on a pool of worker processes.
+
+    Texts are split into chunks of ``chunk_size``; each worker analyzes
+    whole chunks, so the keyword scan runs on every core instead of behind
+    one GIL. Results come back in input order. At most ``max_in_flight``
+    chunks are queued at a time, which bounds memory for long inputs.
+    ``workers=0`` analyzes inline with the same API.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 1000,
+                 max_in_flight: Optional[int] = None, agent: Optional[AgentWhite] = None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight or max(self.workers, 1) * 2
+        self.agent = agent or AgentWhite()
+        self.tables: Optional[SharedTables] = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        if self.workers > 0:
+            self.tables = SharedTables.create(self.agent)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(self.tables.spec,))
+
+    def imap(self, texts: Iterable[str]) -> Iterator[BalancedResponseBatch]:
+        """Yields one batch per chunk of texts, in input order."""
+        chunks = chunked(texts, self.chunk_size)
+        if self.pool is None:
+            for chunk in chunks:
+                yield self.agent.calculate_balanced_responses(chunk)
+            return
+        pending = deque()
+        for chunk in chunks:
+            pending.append((self.pool.submit(_analyze_chunk, chunk), chunk))
+            if len(pending) >= self.max_in_flight:
+                yield self._collect(*pending.popleft())
+        while pending:
+            yield self._collect(*pending.popleft())
+
+    @staticmethod
+    def _collect(future, chunk: List[str]) -> BalancedResponseBatch:
+        batch = future.result()
+        batch.contexts = chunk
+        return batch
+
+    def analyze(self, texts: Iterable[str]) -> BalancedResponseBatch:
+        """Analyzes all texts and returns one batch in input order."""
+        batches = list(self.imap(texts))
+        if not batches:
+            return self.agent.calculate_balanced_responses([])
+        return BalancedResponseBatch.concatenate(batches)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.tables is not None:
+            self.tables.close()
+            self.tables = None
+
+    def __enter__(self) -> "ParallelEngine":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def benchmark(size: int, workers: List[int], chunk_size: int = 1000) -> Dict[int, float]:
+    """Texts per second for each worker count on a synthetic corpus."""
+    from benchmark import synthetic_corpus
+
+    texts = synthetic_corpus(size)
+    results = {}
+    for count in workers:
+        with ParallelEngine(workers=count, chunk_size=chunk_size) as engine:
+            # Warm de pool op zodat het starten van processen niet meetelt
+            engine.analyze(texts[:chunk_size * max(count, 1)])
+            start = time.perf_counter()
+            engine.analyze(texts)
+            results[count] = size / (time.perf_counter() - start)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ParallelEngine throughput per worker count")
+    parser.add_argument("--texts", type=int, default=200000, help="Size of the synthetic corpus")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    results = benchmark(args.texts, sorted(set(args.workers)), args.chunk_size)
+    inline = results.get(0)
+    for count, rate in results.items():
+        speedup = f"  x{rate / inline:.2f}" if inline else ""
+        print(f"workers={count:<3d} {rate:>12,.0f} texts/s{speedup}")
+
+
+if __name__ == "__main__":
+    main()
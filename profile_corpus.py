@@ -0,0 +1,303 @@
+import argparse
+import cProfile
+import functools
+import io
+import itertools
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from agent_white import AgentWhite
+from color_utils import ColorConverter
+from corpus_analyzer import chunked, detect_format, read_texts
+
+# Frames per allocatie in tracemalloc; meer frames geven betere sites maar zijn trager
+TRACEMALLOC_FRAMES = 8
+
+# Aantal requests waarvan de geheugenpas de piek ontleedt; elke request kost twee snapshots
+MEMORY_SAMPLES = 50
+
+_REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _convert(cmyk: Tuple[float, float, float, float]) -> Tuple:
+    """The ColorConverter chain for one rainbow color."""
+    rgb = ColorConverter.cmyk_to_rgb(*cmyk)
+    lab = ColorConverter.rgb_to_lab(*rgb)
+    return (ColorConverter.cmyk_to_hex(*cmyk), ColorConverter.lab_to_rgb(*lab),
+            ColorConverter.generate_analogous_palette(*lab))
+
+
+TARGETS = ("balanced_response", "analyze_context", "batch", "converter")
+
+
+def build_steps(name: str, agent: AgentWhite, texts: List[str], chunk_size: int = 1000) -> List[Callable[[], object]]:
+    """One callable per request (per chunk for ``batch``) of the named target.
+
+    For ``converter`` the analyses are done up front, so only the
+    ColorConverter chain on each rainbow color is profiled.
+    """
+    if name == "balanced_response":
+        return [functools.partial(agent.calculate_balanced_response, text) for text in texts]
+    if name == "analyze_context":
+        return [functools.partial(agent.interpreter.analyze_context, text) for text in texts]
+    if name == "batch":
+        return [functools.partial(agent.calculate_balanced_responses, chunk) for chunk in chunked(texts, chunk_size)]
+    if name == "converter":
+        return [functools.partial(_convert, agent.interpreter.analyze_context(text)[1].cmyk_vector) for text in texts]
+    raise ValueError(f"Unknown target {name!r}")
+
+
+def build_target(name: str, agent: AgentWhite, texts: List[str], chunk_size: int = 1000) -> Callable[[], List]:
+    """Returns a callable that runs all of ``build_steps`` and returns their results.
+
+    The CPU and memory passes therefore always exercise the same calls.
+    """
+    steps = build_steps(name, agent, texts, chunk_size)
+    return lambda: [step() for step in steps]
+
+
+class FoldedStackProfiler:
+    """Deterministic profiler that records self time per complete call stack.
+
+    ``folded()`` returns the stacks in the "folded" format of Brendan
+    Gregg's flamegraph.pl (``frame;frame;frame microseconds``), which
+    speedscope and most flame graph viewers also read. Frames are labelled
+    ``file.py:function:line`` so time maps to definitions in the source.
+    """
+
+    def __init__(self):
+        self.stacks: Dict[Tuple[str, ...], float] = defaultdict(float)
+        self._stack: List[List] = []  # [label, start, kindtijd]
+        self._labels: Dict[object, str] = {}
+
+    def _label(self, frame, arg, event: str) -> str:
+        if event.startswith("c_"):
+            module = getattr(arg, "__module__", None) or type(getattr(arg, "__self__", None)).__name__
+            return f"{module}.{getattr(arg, '__qualname__', arg)}"
+        code = frame.f_code
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}"
+        return label
+
+    def _callback(self, frame, event: str, arg):
+        now = time.perf_counter()
+        if event in ("call", "c_call"):
+            self._stack.append([self._label(frame, arg, event), now, 0.0])
+        elif self._stack:  # return, c_return, c_exception
+            label, start, child_time = self._stack.pop()
+            elapsed = now - start
+            self.stacks[tuple(entry[0] for entry in self._stack) + (label,)] += elapsed - child_time
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def run(self, function: Callable):
+        sys.setprofile(self._callback)
+        try:
+            return function()
+        finally:
+            sys.setprofile(None)
+            self._stack.clear()
+
+    def folded(self) -> str:
+        lines = [f"{';'.join(stack)} {round(seconds * 1e6)}" for stack, seconds in self.stacks.items()
+                 if round(seconds * 1e6) > 0]
+        return "\n".join(sorted(lines)) + "\n"
+
+
+def profile_cpu(run: Callable[[], List], top: int, sort: str = "cumulative",
+                pstats_path: Optional[str] = None) -> Tuple[float, str]:
+    """Runs once under cProfile; returns wall time and the top functions as text."""
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.runcall(run)
+    elapsed = time.perf_counter() - start
+    if pstats_path:
+        profiler.dump_stats(pstats_path)
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).strip_dirs().sort_stats(sort).print_stats(top)
+    return elapsed, report.getvalue()
+
+
+def _site(traceback: tracemalloc.Traceback) -> str:
+    """file:line of the innermost frame in this repository, so NumPy internals count at their caller."""
+    for frame in reversed(traceback):  # nieuwste frame eerst
+        if os.path.dirname(os.path.abspath(frame.filename)) == _REPO_DIR:
+            break
+    else:
+        frame = traceback[-1]
+    return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+
+class _PeakSnapshot:
+    """Profile hook that takes one tracemalloc snapshot once traced memory reaches ``threshold``.
+
+    Checked on every function and C call return, where the locals and
+    return value of the call are still alive, so transient allocations
+    (intermediate dicts, arrays, strings) are in the snapshot. Without a
+    threshold it only records the ``highest`` traced memory seen at those
+    points: temporaries that live and die inside one C call (NumPy
+    intermediates) raise tracemalloc's peak but can never be snapshotted,
+    so the threshold for the second run comes from this value.
+    """
+
+    def __init__(self, threshold: Optional[int] = None):
+        self.threshold = threshold
+        self.highest = 0
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def __call__(self, frame, event: str, arg):
+        if self.snapshot is None and event in ("return", "c_return"):
+            current = tracemalloc.get_traced_memory()[0]
+            if self.threshold is None:
+                self.highest = max(self.highest, current)
+            elif current >= self.threshold:
+                self.snapshot = tracemalloc.take_snapshot()
+
+
+def profile_memory(steps: List[Callable[[], object]], top: int, samples: int = MEMORY_SAMPLES,
+                   reset: Optional[Callable[[], None]] = None) -> Tuple[float, int, List[Tuple[str, float, float]]]:
+    """Attributes the working set of each request to allocation sites.
+
+    For up to ``samples`` requests, evenly spread over ``steps``: a first
+    run measures the request's peak traced memory, a second run takes a
+    snapshot when that peak is reached again and compares it with a
+    snapshot from just before the request. This shows the allocations
+    that are alive at the peak, including transient ones that are freed
+    before the request returns. ``reset`` (e.g. clearing result caches)
+    runs before each run so both see the same work.
+
+    Returns the mean peak above the starting point per request, the
+    number of requests analyzed and, per source line, the mean bytes and
+    blocks alive at the peak.
+    """
+    chosen = steps[::max(1, len(steps) // samples)][:samples]
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    sizes: Dict[str, float] = defaultdict(float)
+    counts: Dict[str, float] = defaultdict(float)
+    peaks, analyzed = 0, 0
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    try:
+        for step in chosen:
+            if reset is not None:
+                reset()
+            start, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            probe = _PeakSnapshot()
+            sys.setprofile(probe)
+            try:
+                result = step()
+            finally:
+                sys.setprofile(None)
+            _, peak = tracemalloc.get_traced_memory()
+            del result
+
+            if reset is not None:
+                reset()
+            before = tracemalloc.take_snapshot()
+            # Het nemen van de eerste snapshot kost zelf geheugen; meet vanaf hier
+            hook = _PeakSnapshot(tracemalloc.get_traced_memory()[0] + (probe.highest - start))
+            sys.setprofile(hook)
+            try:
+                result = step()
+            finally:
+                sys.setprofile(None)
+            del result
+            if hook.snapshot is None:
+                continue
+            analyzed += 1
+            peaks += peak - start
+            after = hook.snapshot.filter_traces(ignore)
+            for stat in after.compare_to(before.filter_traces(ignore), "traceback"):
+                if stat.size_diff > 0:
+                    site = _site(stat.traceback)
+                    sizes[site] += stat.size_diff
+                    counts[site] += stat.count_diff
+    finally:
+        tracemalloc.stop()
+    if not analyzed:
+        return 0.0, 0, []
+    ranked = sorted(sizes, key=sizes.get, reverse=True)[:top]
+    return peaks / analyzed, analyzed, [(site, sizes[site] / analyzed, counts[site] / analyzed) for site in ranked]
+
+
+def load_texts(path: Optional[str], synthetic: Optional[int], field: str, limit: Optional[int]) -> List[str]:
+    if path is None:
+        from benchmark import synthetic_corpus
+        return synthetic_corpus(synthetic or 1000)
+    input_format = detect_format(path)
+    with open(path, encoding="utf-8", newline="" if input_format == "csv" else None) as stream:
+        return list(itertools.islice(read_texts(stream, input_format, field), limit))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile CPU time and allocations over a corpus")
+    parser.add_argument("corpus", nargs="?", help="Corpus file (.jsonl, .csv or text); omit for --synthetic")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Profile a synthetic corpus of N texts")
+    parser.add_argument("--field", default="text", help="JSON field or CSV column holding the text")
+    parser.add_argument("--limit", type=int, help="Profile at most this many texts")
+    parser.add_argument("--target", choices=TARGETS, default="balanced_response")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Texts per call for --target batch")
+    parser.add_argument("--cache-size", type=int, default=0, help="AgentWhite cache size, as in production")
+    parser.add_argument("--top", type=int, default=25, help="Rows in each report")
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key (cumulative, tottime, ncalls)")
+    parser.add_argument("--pstats", metavar="PATH", help="Save the raw cProfile stats (snakeviz, pstats)")
+    parser.add_argument("--flamegraph", metavar="PATH", help="Save folded stacks for flamegraph.pl or speedscope")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--memory-samples", type=int, default=MEMORY_SAMPLES,
+                        help="Requests whose peak the tracemalloc pass breaks down")
+    args = parser.parse_args()
+
+    if args.corpus is None and args.synthetic is None:
+        parser.error("give a corpus file or --synthetic N")
+    texts = load_texts(args.corpus, args.synthetic, args.field, args.limit)
+    if not texts:
+        parser.error("the corpus is empty")
+
+    # Elke pass krijgt een verse agent, zodat caches niet tussen passes lekken
+    def fresh_agent() -> AgentWhite:
+        agent = AgentWhite(cache_size=args.cache_size)
+        build_target(args.target, agent, texts[:100], args.chunk_size)()  # opwarmen: lazy imports, tabellen
+        clear_caches(agent)
+        return agent
+
+    def clear_caches(agent: AgentWhite):
+        if agent.cache is not None:
+            agent.cache.clear()
+            agent.interpreter.cache.clear()
+
+    def fresh_target():
+        return build_target(args.target, fresh_agent(), texts, args.chunk_size)
+
+    print(f"Profiling {args.target} over {len(texts)} texts\n")
+    elapsed, report = profile_cpu(fresh_target(), args.top, args.sort, args.pstats)
+    print(f"cProfile: {elapsed:.3f} s total, {elapsed / len(texts) * 1e6:.1f} µs per request (profiled)")
+    print(report)
+
+    if args.flamegraph:
+        profiler = FoldedStackProfiler()
+        profiler.run(fresh_target())
+        with open(args.flamegraph, "w", encoding="utf-8") as f:
+            f.write(profiler.folded())
+        print(f"Folded stacks ({len(profiler.stacks)} unique) written to {args.flamegraph}; "
+              f"render with flamegraph.pl {args.flamegraph} > profile.svg or open it in speedscope\n")
+
+    if not args.no_memory:
+        agent = fresh_agent()
+        peak, analyzed, sites = profile_memory(build_steps(args.target, agent, texts, args.chunk_size), args.top,
+                                               args.memory_samples, reset=lambda: clear_caches(agent))
+        unit = "chunk" if args.target == "batch" else "request"
+        print(f"tracemalloc: mean peak {peak / 1024:.1f} KiB per {unit} over {analyzed} sampled {unit}s")
+        print(f"Top allocation sites alive at the peak, per {unit}:")
+        print(f"  {'site':40s} {'bytes':>12s} {'blocks':>12s}")
+        for site, size, count in sites:
+            print(f"  {site:40s} {size:12.1f} {count:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import signal
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Optional, Tuple, Union
+
+import instrumentation
+from agent_white import AgentWhite
+from color_utils import ColorConverter
+
+# Maximale grootte van een request body en van de headers (bytes)
+MAX_BODY_SIZE = 64 * 1024
+MAX_HEADER_SIZE = 16 * 1024
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    501: "Not Implemented",
+}
+
+# Agent per worker proces (gezet door _init_process_worker)
+_worker_agent: Optional[AgentWhite] = None
+
+
+def analysis_payload(agent: AgentWhite, text: str) -> Dict:
+    """Analyseert text en geeft precies de velden terug die ReMonsterLabUI verwacht."""
+    analysis = agent.interpreter.analyze_context(text)
+    response = agent.calculate_balanced_response(text, analysis)
+    decision = analysis[1]
+
+    hex_color = response["rainbow_vector"].lstrip('#')
+    l, a, b = ColorConverter.rgb_to_lab(int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16))
+
+    return {
+        "rainbow_vector": response["rainbow_vector"],
+        "rainbow_vector_lab": {"L": l, "a": a, "b": b},
+        "cmyk_vector": list(decision.cmyk_vector),
+        "dominant_emotions": response["dominant_emotions"],
+        "strategy": response["strategy"],
+    }
+
+
+def _init_process_worker(cache_size: int = 0, cache_ttl: Optional[float] = None, lexicon: Optional[str] = None):
+    """Bouwt één AgentWhite per worker proces; het lexicon wordt per proces gemapt."""
+    global _worker_agent
+    _worker_agent = AgentWhite(cache_size=cache_size, cache_ttl=cache_ttl, lexicon=lexicon)
+
+
+def _process_worker_payload(text: str) -> Dict:
+    return analysis_payload(_worker_agent, text)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str = ""):
+        super().__init__(message or HTTP_REASONS.get(status, ""))
+        self.status = status
+
+
+class AnalysisServer:
+    """Asyncio HTTP/1.1 server voor ``POST /api/analyze``.
+
+    Eén voorgeladen AgentWhite wordt gedeeld door alle verbindingen.
+    Analyses draaien inline in de event loop (``workers=0``, het snelst voor
+    korte teksten), in een thread pool of in een process pool met één agent
+    per proces. Verbindingen blijven open (keep-alive) tot de client ze
+    sluit of om ``Connection: close`` vraagt.
+    """
+
+    def __init__(self, workers: int = 0, pool: str = "thread", keep_alive_timeout: float = 15.0,
+                 cache_size: int = 0, cache_ttl: Optional[float] = None, metrics: bool = False,
+                 lexicon: Optional[str] = None):
+        if metrics:
+            # Latency per stage en tellers, te lezen via GET /metrics
+            instrumentation.enable()
+        self.metrics = metrics
+        self.agent = AgentWhite(cache_size=cache_size, cache_ttl=cache_ttl, lexicon=lexicon)
+        self.keep_alive_timeout = keep_alive_timeout
+        self.executor: Optional[Executor] = None
+        self._analyze = partial(analysis_payload, self.agent)
+        if workers > 0 and pool == "process":
+            # spawn: workers erven de luisterende socket niet
+            self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_process_worker,
+                                                initargs=(cache_size, cache_ttl, lexicon),
+                                                mp_context=multiprocessing.get_context("spawn"))
+            self._analyze = _process_worker_payload
+        elif workers > 0:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    async def analyze(self, text: str) -> Dict:
+        if self.executor is None:
+            return self._analyze(text)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._analyze, text)
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict[str, str], bytes]]:
+        """Leest één request; None als de client de verbinding sloot."""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keep_alive_timeout)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "Headers too large")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(501, "Chunked request bodies are not supported")
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(413)
+        body = await reader.readexactly(length) if length else b""
+        return method, path.split("?", 1)[0], version, headers, body
+
+    async def _handle(self, method: str, path: str, body: bytes) -> Union[Dict, str]:
+        if path == "/api/analyze":
+            if method != "POST":
+                raise HTTPError(405)
+            try:
+                text = json.loads(body)["text"]
+            except (ValueError, KeyError, TypeError):
+                raise HTTPError(400, 'Expected a JSON body of the form {"text": "..."}')
+            if not isinstance(text, str):
+                raise HTTPError(400, '"text" must be a string')
+            return await self.analyze(text)
+        if path == "/healthz":
+            return {"status": "ok"}
+        if path == "/metrics" and self.metrics:
+            return instrumentation.metrics.to_prometheus()
+        raise HTTPError(404)
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload: Union[Dict, str], keep_alive: bool):
+        # Tekst payloads (Prometheus metrics) gaan als text/plain
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, version, headers, body = request
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection != "close" and (version != "HTTP/1.0" or connection == "keep-alive")
+                    status, payload = 200, await self._handle(method, path, body)
+                except HTTPError as error:
+                    # Na een parse fout is de stream niet meer betrouwbaar
+                    status, payload, keep_alive = error.status, {"error": str(error)}, False
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as error:
+                    status, payload, keep_alive = 500, {"error": str(error)}, False
+
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000):
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_SIZE, backlog=1024)
+        loop = asyncio.get_running_loop()
+        serving = asyncio.current_task()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, serving.cancel)
+        print(f"Listening on http://{host}:{port}/api/analyze")
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-Monster analysis HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Size of the worker pool; 0 analyzes inline in the event loop")
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+    parser.add_argument("--keep-alive-timeout", type=float, default=15.0)
+    parser.add_argument("--cache-size", type=int, default=0, help="Entries in the analysis cache; 0 disables it")
+    parser.add_argument("--cache-ttl", type=float, default=None, help="Seconds before a cached analysis expires")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Record per-stage latencies and serve them at GET /metrics (inline or thread pool)")
+    parser.add_argument("--lexicon", help="Binary lexicon (built with lexicon.py) to use next to the keywords")
+    args = parser.parse_args()
+    if args.metrics and args.workers > 0 and args.pool == "process":
+        parser.error("--metrics only sees analyses in this process; use --pool thread or --workers 0")
+
+    server = AnalysisServer(workers=args.workers, pool=args.pool, keep_alive_timeout=args.keep_alive_timeout,
+                            cache_size=args.cache_size, cache_ttl=args.cache_ttl, metrics=args.metrics,
+                            lexicon=args.lexicon)
+    asyncio.run(server.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()